@@ -6,38 +6,86 @@
 
 import os
 import io
+import argparse
+import hashlib
 import json
 import math
+import queue
 import random
+import struct
 import sys
+import tempfile
+import threading
+import time
+from array import array
+
+# Відлік часу старту - до імпорту Panda3D
+STARTUP_TIME = time.perf_counter()
+
 from direct.showbase.ShowBase import ShowBase
 from direct.gui.OnscreenText import OnscreenText
 from direct.gui.DirectGui import DirectFrame, DirectButton, DirectLabel, DirectWaitBar
 from panda3d.core import *
-from mapbox import Static
-from PIL import Image
-from direct.interval.LerpInterval import LerpPosInterval, LerpScaleInterval, LerpHprInterval
-from direct.interval.IntervalGlobal import Sequence, Parallel, Func
 from direct.task import Task
 
 # -----------------------------
-# OpenXR імпорт та перевірка
+# STARTUP PROFILER
 # -----------------------------
-try:
-    from panda3d.core import OpenXRInterface
-    from panda3d.core import VRSystem
-    from panda3d.core import VrpnAnalog, VrpnButton, VrpnTracker
-    OPENXR_AVAILABLE = True
-    print("[VR] OpenXR підтримку знайдено")
-except ImportError as e:
-    OPENXR_AVAILABLE = False
-    print(f"[VR] OpenXR не доступний: {e}")
+class StartupProfiler:
+    """Розбивка часу до першого кадру за фазами"""
+
+    def __init__(self, start):
+        self.start = start
+        self.last = start
+        self.phases = []
+
+    def mark(self, phase):
+        """Завершення фази: час від попередньої позначки"""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self):
+        total = self.last - self.start
+        print("[STARTUP] Профіль запуску:")
+        for phase, duration in self.phases:
+            share = duration / total * 100 if total else 0
+            print(f"[STARTUP]   {phase:<24} {duration * 1000:8.1f} мс {share:5.1f}%")
+        print(f"[STARTUP]   {'разом':<24} {total * 1000:8.1f} мс")
+
+startup_profiler = StartupProfiler(STARTUP_TIME)
+startup_profiler.mark("imports")
+
+# -----------------------------
+# OpenXR імпорт та перевірка (ліниво, лише коли VR увімкнено)
+# -----------------------------
+OPENXR_AVAILABLE = None  # невідомо до першої перевірки
+OpenXRInterface = None
+
+def probe_openxr():
+    """Перевірка та імпорт OpenXR при першому зверненні"""
+    global OPENXR_AVAILABLE, OpenXRInterface
+    if OPENXR_AVAILABLE is None:
+        try:
+            from panda3d.core import OpenXRInterface as interface
+            from panda3d.core import VRSystem
+            from panda3d.core import VrpnAnalog, VrpnButton, VrpnTracker
+            OpenXRInterface = interface
+            OPENXR_AVAILABLE = True
+            print("[VR] OpenXR підтримку знайдено")
+            print("[OK] OpenXR доступний")
+        except ImportError as e:
+            OPENXR_AVAILABLE = False
+            print(f"[VR] OpenXR не доступний: {e}")
+            print("[WARN] OpenXR не доступний, робота в десктоп режимі")
+    return OPENXR_AVAILABLE
 
 # -----------------------------
 # CONFIG
 # -----------------------------
-def load_itconfig(path="itconfig.json"):
-    default_config = {
+def default_itconfig():
+    """Стандартна конфігурація"""
+    return {
         "demo_mode": True,
         "vr_strap": "100%",  # Змінено на 100% для VR
         "vr_handedness": "right",  # права/ліва рука
@@ -51,13 +99,21 @@ def load_itconfig(path="itconfig.json"):
         "sound_enabled": True,
         "music_volume": 0.7,
         "effects_volume": 0.8,
-        "anime_effects": True  # аніме-ефекти (іскри, аура)
+        "anime_effects": True,  # аніме-ефекти (іскри, аура)
+        "lod_enabled": True,  # quadtree LOD для об'єктів світу
+        "lod_pixel_error": 2.0,  # допустима похибка на екрані (пікселі)
+        "lod_max_swaps": 8,  # максимум перемикань LOD за кадр
+        "baked_lighting": True,  # запікання освітлення статичних об'єктів
+        "sfx_voices": 8,  # одночасних звукових ефектів
+        "sfx_cull_distance": 30.0  # ефекти далі від HMD не програються (метри)
     }
+
+def load_itconfig(path="itconfig.json"):
+    """Читання конфігурації; файл на диску не створюється (див. save_default_itconfig)"""
+    default_config = default_itconfig()
     
     if not os.path.exists(path):
-        print(f"[CONFIG] Конфігурацію не знайдено, створюю стандартну {path}")
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(default_config, f, indent=4)
+        print("[CONFIG] Конфігурацію не знайдено, використовую стандартну")
         return default_config
     
     try:
@@ -71,6 +127,277 @@ def load_itconfig(path="itconfig.json"):
         print(f"[CONFIG] Помилка завантаження: {e}")
         return default_config
 
+def save_default_itconfig(path="itconfig.json"):
+    """Створення стандартного файлу конфігурації, якщо його немає"""
+    if not os.path.exists(path):
+        print(f"[CONFIG] Конфігурацію не знайдено, створюю стандартну {path}")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(default_itconfig(), f, indent=4)
+
+# -----------------------------
+# ASSET BUNDLE (запечені .bam в одному Multifile)
+# -----------------------------
+ASSET_BUNDLE = "assets.mf"
+ASSET_MOUNT_POINT = "/baked"
+BAKED_MODELS = ["models/box", "models/sphere", "models/anime_hand"]
+BAKED_FONTS = ["cmss12"]
+BUNDLE_MANIFEST = "manifest.json"  # ім'я .bam -> [шлях джерела, mtime, розмір]
+SOURCE_EXTENSIONS = ("egg", "egg.pz", "bam")
+baked_asset_names = set()
+
+def find_asset_source(name):
+    """Вихідний файл ассета на шляхах моделей (без змонтованого бандла)"""
+    vfs = VirtualFileSystem.getGlobalPtr()
+    search_path = DSearchPath(getModelPath().getValue())
+    for extension in SOURCE_EXTENSIONS:
+        filename = Filename(f"{name}.{extension}")
+        if vfs.resolveFilename(filename, search_path) and not filename.getFullpath().startswith(ASSET_MOUNT_POINT):
+            return filename.getFullpath()
+    return None
+
+def source_stamp(path):
+    """[mtime, розмір] через VFS (враховує і неявні .pz)"""
+    source = VirtualFileSystem.getGlobalPtr().getFile(Filename(path))
+    if source is None:
+        return None
+    return [source.getTimestamp(), source.getFileSize()]
+
+def bake_assets(bundle_path=ASSET_BUNDLE):
+    """Конвертація всіх ассетів гри в оптимізовані .bam та пакування в Multifile"""
+    # Текстури зберігаються всередині .bam, без окремого читання файлів зображень
+    loadPrcFileData("", "bam-texture-mode rawdata")
+    model_loader = Loader.getGlobalPtr()
+    options = LoaderOptions(LoaderOptions.LF_search | LoaderOptions.LF_report_errors |
+                            LoaderOptions.LF_no_cache)
+
+    bundle = Multifile()
+    bundle.setRecordTimestamp(False)
+    if not bundle.openWrite(Filename(bundle_path)):
+        print(f"[BAKE] Не вдалося створити {bundle_path}")
+        return False
+
+    manifest = {}
+    with tempfile.TemporaryDirectory() as build_dir:
+        for asset in BAKED_MODELS + BAKED_FONTS:
+            node = model_loader.loadSync(Filename(asset), options)
+            if node is None:
+                print(f"[BAKE] Пропущено {asset}: файл не знайдено")
+                continue
+
+            model = NodePath(node)
+            # Шрифти не сплющуємо: TextFont шукає гліфи за іменами вузлів
+            if asset not in BAKED_FONTS:
+                model.flattenStrong()
+                for texture in model.findAllTextures():
+                    if texture.hasRamImage() and texture.getRamImageCompression() == Texture.CM_off:
+                        compression = Texture.CM_dxt5 if texture.getNumComponents() == 4 else Texture.CM_dxt1
+                        texture.compressRamImage(compression, Texture.QL_default, None)
+
+            bam_name = asset + ".bam"
+            bam_path = Filename.fromOsSpecific(os.path.join(build_dir, bam_name))
+            bam_path.setBinary()
+            bam_path.makeDir()
+            if not model.writeBamFile(bam_path):
+                print(f"[BAKE] Помилка запису {bam_name}")
+                continue
+
+            # Без стиснення: підфайл читається напряму, без розпакування
+            bundle.addSubfile(bam_name, bam_path, 0)
+            source = find_asset_source(asset)
+            if source:
+                manifest[bam_name] = [source] + source_stamp(source)
+            print(f"[BAKE] {asset} -> {bam_name}")
+
+        manifest_path = Filename.fromOsSpecific(os.path.join(build_dir, BUNDLE_MANIFEST))
+        manifest_path.setText()
+        with open(manifest_path.toOsSpecific(), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1)
+        bundle.addSubfile(BUNDLE_MANIFEST, manifest_path, 0)
+
+        bundle.repack()
+        bundle.close()
+
+    print(f"[BAKE] Готово: {bundle_path}")
+    return True
+
+def mount_asset_bundle(bundle_path=ASSET_BUNDLE):
+    """Монтування запеченого Multifile у VFS перед шляхами моделей"""
+    if not os.path.exists(bundle_path):
+        return False
+
+    bundle = Multifile()
+    vfs = VirtualFileSystem.getGlobalPtr()
+    if not (bundle.openRead(Filename(bundle_path)) and
+            vfs.mount(bundle, ASSET_MOUNT_POINT, VirtualFileSystem.MF_read_only)):
+        print(f"[ASSETS] Не вдалося змонтувати {bundle_path}")
+        return False
+
+    # Запечений .bam використовується, лише якщо джерело не змінилося після запікання
+    # (відсутнє джерело - звичайна ситуація для зібраної гри, тоді .bam лишається в силі)
+    manifest = {}
+    index = bundle.findSubfile(BUNDLE_MANIFEST)
+    if index >= 0:
+        manifest = json.loads(bundle.readSubfile(index))
+    for name in bundle.getSubfileNames():
+        if name == BUNDLE_MANIFEST:
+            continue
+        source = manifest.get(name)
+        stamp = source_stamp(source[0]) if source else None
+        if stamp is not None and stamp != source[1:]:
+            print(f"[ASSETS] {name} застарів ({source[0]} змінено), використовується джерело")
+            continue
+        baked_asset_names.add(name)
+    getModelPath().prependDirectory(ASSET_MOUNT_POINT)
+    print(f"[ASSETS] Змонтовано {bundle_path} у {ASSET_MOUNT_POINT}")
+    return True
+
+def baked(name):
+    """Ім'я ассета з урахуванням бандла: запечений .bam, якщо він є"""
+    bam_name = name + ".bam"
+    return bam_name if bam_name in baked_asset_names else name
+
+def asset_exists(name):
+    """Перевірка наявності моделі на шляхах моделей (включно з Multifile)"""
+    vfs = VirtualFileSystem.getGlobalPtr()
+    for extension in ("bam", "egg"):
+        filename = Filename(f"{name}.{extension}")
+        if vfs.resolveFilename(filename, getModelPath().getValue()):
+            return True
+    return False
+
+# ============================================
+# TRACKING RECORD / REPLAY (запис сесій VR)
+# ============================================
+TRACKING_MAGIC = b"SVRTRAK\0"
+TRACKING_VERSION = 1
+TRACKING_HEADER = struct.Struct("<8sHHId")  # magic, версія, розмір запису, seed, час старту
+TRACKING_RECORD = struct.Struct("<dIBBH6f")  # час, кадр, тип, джерело, код, 6 значень
+
+# Типи записів
+REC_POSE = 1  # x, y, z, h, p, r
+REC_BUTTON = 2  # код кнопки
+REC_JOYSTICK = 3  # x, y
+
+# Джерела трекінгу
+TRACK_HEAD = 0
+TRACK_LEFT = 1
+TRACK_RIGHT = 2
+TRACK_HANDS = {'left': TRACK_LEFT, 'right': TRACK_RIGHT}
+TRACK_HAND_NAMES = {TRACK_LEFT: 'left', TRACK_RIGHT: 'right'}
+
+# Коди кнопок -> обробники VRSystemManager
+INPUT_TRIGGER_PRESS = 1
+INPUT_TRIGGER_RELEASE = 2
+INPUT_GRIP_PRESS = 3
+INPUT_GRIP_RELEASE = 4
+INPUT_MENU_PRESS = 5
+INPUT_HANDLERS = {
+    INPUT_TRIGGER_PRESS: "on_trigger_press",
+    INPUT_TRIGGER_RELEASE: "on_trigger_release",
+    INPUT_GRIP_PRESS: "on_grip_press",
+    INPUT_GRIP_RELEASE: "on_grip_release",
+    INPUT_MENU_PRESS: "on_menu_press",
+}
+
+class TrackingRecorder:
+    """Запис поз і вводу у бінарний лог фіксованого розміру; запис на диск у фоновому потоці"""
+
+    def __init__(self, path, seed):
+        self.path = path
+        self.seed = seed
+        self.start = time.perf_counter()
+        self.frame = 0
+        self.records = 0
+        self.buffer = bytearray()
+        self.queue = queue.Queue()
+
+        self.file = open(path, "wb")
+        self.file.write(TRACKING_HEADER.pack(TRACKING_MAGIC, TRACKING_VERSION,
+                                             TRACKING_RECORD.size, seed, time.time()))
+        self.writer = threading.Thread(target=self.writer_loop, name="TrackingWriter", daemon=True)
+        self.writer.start()
+        print(f"[REC] Запис трекінгу в {path}")
+
+    def record(self, kind, source, code=0, values=(0, 0, 0, 0, 0, 0)):
+        self.buffer += TRACKING_RECORD.pack(time.perf_counter() - self.start, self.frame,
+                                            kind, source, code, *values)
+        self.records += 1
+
+    def end_frame(self):
+        """Кінець кадру: передаємо накопичені записи потоку запису"""
+        if self.buffer:
+            self.queue.put(bytes(self.buffer))
+            self.buffer = bytearray()
+        self.frame += 1
+
+    def writer_loop(self):
+        while True:
+            chunk = self.queue.get()
+            if chunk is None:
+                break
+            self.file.write(chunk)
+        self.file.close()
+
+    def close(self):
+        self.end_frame()
+        self.queue.put(None)
+        self.writer.join()
+        print(f"[REC] Записано {self.records} записів за {self.frame} кадрів")
+
+class TrackingReplay:
+    """Потокове читання логу трекінгу покадрово"""
+
+    CHUNK_RECORDS = 4096
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        header = self.file.read(TRACKING_HEADER.size)
+        if len(header) < TRACKING_HEADER.size:
+            raise ValueError(f"Пошкоджений лог трекінгу: {path}")
+        magic, version, record_size, self.seed, self.start_time = TRACKING_HEADER.unpack(header)
+        if magic != TRACKING_MAGIC or version != TRACKING_VERSION or record_size != TRACKING_RECORD.size:
+            raise ValueError(f"Непідтримуваний лог трекінгу: {path}")
+
+        self.pending = []
+        self.finished = False
+        self.frame = 0
+        self.frame_times = []
+        print(f"[REPLAY] Відтворення {path} (seed {self.seed})")
+
+    def read_chunk(self):
+        data = self.file.read(TRACKING_RECORD.size * self.CHUNK_RECORDS)
+        data = data[:len(data) - len(data) % TRACKING_RECORD.size]
+        if not data:
+            return False
+        self.pending = list(TRACKING_RECORD.iter_unpack(data))
+        self.pending.reverse()
+        return True
+
+    def next_frame(self):
+        """Записи наступного кадру (список кортежів TRACKING_RECORD)"""
+        frame_records = []
+        while not self.finished:
+            if not self.pending:
+                if not self.read_chunk():
+                    self.finished = True
+                    self.file.close()
+                    break
+            if self.pending[-1][1] != self.frame:
+                break
+            frame_records.append(self.pending.pop())
+        self.frame += 1
+        return frame_records
+
+    def report(self):
+        """Статистика часу кадру під час відтворення"""
+        times = sorted(self.frame_times)
+        if not times:
+            return
+        average = sum(times) / len(times)
+        p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+        print(f"[REPLAY] {len(times)} кадрів: середній {average * 1000:.2f} мс, "
+              f"p95 {p95 * 1000:.2f} мс, макс {times[-1] * 1000:.2f} мс")
+
 # ============================================
 # VR SYSTEM CLASS
 # ============================================
@@ -79,22 +406,63 @@ class VRSystemManager:
     
     def __init__(self, base):
         self.base = base
-        self.config = load_itconfig()
+        self.game_config = base.game_config
         self.vr_initialized = False
         self.vr_controllers = {}
         self.vr_hmd = None
         self.vr_origin = render.attachNewNode("VR_Origin")
+        self.origin_id = base.entities.create()
+        base.entities.bind(self.origin_id, self.vr_origin)
         
         # Трекінг рук
         self.left_hand = self.vr_origin.attachNewNode("LeftHand")
         self.right_hand = self.vr_origin.attachNewNode("RightHand")
         self.head = self.vr_origin.attachNewNode("Head")
         
+        # Пози трекінгу теж ідуть через сховище: entity_sync (sort 45) встигає до igLoop,
+        # тож кадр рендериться з позою цього ж кадру
+        self.tracked_ids = {}
+        for source, node in ((TRACK_HEAD, self.head), (TRACK_LEFT, self.left_hand),
+                             (TRACK_RIGHT, self.right_hand)):
+            self.tracked_ids[source] = base.entities.create()
+            base.entities.bind(self.tracked_ids[source], node)
+        
         # Моделі для рук (аніме-стиль)
         self.hand_models = {}
         
-        if self.config.get("vr_strap") == "100%" and OPENXR_AVAILABLE:
+        # Запис / відтворення трекінгу
+        self.recorder = None
+        self.replay = None
+        
+        if base.replay_path:
+            self.start_replay(base.replay_path)
+        elif self.game_config.get("vr_strap") == "100%" and probe_openxr():
             self.init_vr()
+        
+        if base.record_path:
+            self.start_recording(base.record_path)
+    
+    def start_recording(self, path):
+        """Запис поз HMD/контролерів і вводу у бінарний лог"""
+        seed = self.replay.seed if self.replay else random.randrange(2 ** 32)
+        random.seed(seed)
+        self.recorder = TrackingRecorder(path, seed)
+    
+    def stop_recording(self):
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
+    
+    def start_replay(self, path):
+        """Відтворення записаної сесії без OpenXR через ті самі шляхи коду"""
+        self.replay = TrackingReplay(path)
+        random.seed(self.replay.seed)
+        self.vr_initialized = True
+        self.setup_vr_camera()
+        try:
+            self.load_hand_models()
+        except Exception as e:
+            print(f"[REPLAY] Моделі рук не завантажено: {e}")
     
     def init_vr(self):
         """Ініціалізація OpenXR"""
@@ -137,8 +505,8 @@ class VRSystemManager:
         self.base.camera.setPos(0, 0, 0)
         
         # Налаштовуємо параметри відображення
-        self.base.cameraLens.setFov(90)  # Типове поле зору для VR
-        self.base.cameraLens.setNearFar(0.1, 1000)
+        self.base.camLens.setFov(90)  # Типове поле зору для VR
+        self.base.camLens.setNearFar(0.1, 1000)
         
         print("[VR] Камеру налаштовано")
     
@@ -147,14 +515,14 @@ class VRSystemManager:
         try:
             # Спроба завантажити моделі рук
             hand_model_path = "models/anime_hand"
-            if os.path.exists(hand_model_path + ".egg") or os.path.exists(hand_model_path + ".bam"):
+            if asset_exists(hand_model_path):
                 for hand in ['left', 'right']:
-                    model = self.base.loader.loadModel(hand_model_path)
+                    model = self.base.loader.loadModel(baked(hand_model_path))
                     model.reparentTo(self.left_hand if hand == 'left' else self.right_hand)
                     model.setScale(0.1)
                     
                     # Аніме-ефекти для рук
-                    if self.config.get("anime_effects", True):
+                    if self.game_config.get("anime_effects", True):
                         self.add_anime_effects(model, hand)
                     
                     self.hand_models[hand] = model
@@ -171,21 +539,21 @@ class VRSystemManager:
         """Створення простих моделей для рук"""
         for hand_name, hand_node in [('left', self.left_hand), ('right', self.right_hand)]:
             # Долоня
-            palm = self.base.loader.loadModel("models/box")
+            palm = self.base.loader.loadModel(baked("models/box"))
             palm.setScale(0.08, 0.1, 0.03)
             palm.setColor(1, 0.8, 0.6, 1)
             palm.reparentTo(hand_node)
             
             # Пальці (прості кубики)
             for i in range(5):
-                finger = self.base.loader.loadModel("models/box")
+                finger = self.base.loader.loadModel(baked("models/box"))
                 finger.setScale(0.02, 0.02, 0.06)
                 finger.setPos(0.03 * i - 0.06, 0, 0.05)
                 finger.setColor(1, 0.8, 0.6, 1)
                 finger.reparentTo(hand_node)
             
             # Аніме-аура
-            aura = self.base.loader.loadModel("models/sphere")
+            aura = self.base.loader.loadModel(baked("models/sphere"))
             aura.setScale(0.15)
             aura.setColor(0.5, 0.8, 1, 0.3)
             aura.setTransparency(TransparencyAttrib.MAlpha)
@@ -196,7 +564,7 @@ class VRSystemManager:
     def add_anime_effects(self, model, hand):
         """Додавання аніме-ефектів до рук"""
         # Аура навколо руки
-        aura = self.base.loader.loadModel("models/sphere")
+        aura = self.base.loader.loadModel(baked("models/sphere"))
         aura.setScale(0.2)
         aura.setColor(0.3, 0.6, 1, 0.2)
         aura.setTransparency(TransparencyAttrib.MAlpha)
@@ -259,30 +627,42 @@ class VRSystemManager:
         """Налаштування кнопок контролера"""
         
         # Кнопка Trigger
-        controller.button_trigger.pressed = lambda: self.on_trigger_press(hand)
-        controller.button_trigger.released = lambda: self.on_trigger_release(hand)
+        controller.button_trigger.pressed = lambda: self.dispatch_input(hand, INPUT_TRIGGER_PRESS)
+        controller.button_trigger.released = lambda: self.dispatch_input(hand, INPUT_TRIGGER_RELEASE)
         
         # Кнопка Grip
-        controller.button_grip.pressed = lambda: self.on_grip_press(hand)
-        controller.button_grip.released = lambda: self.on_grip_release(hand)
+        controller.button_grip.pressed = lambda: self.dispatch_input(hand, INPUT_GRIP_PRESS)
+        controller.button_grip.released = lambda: self.dispatch_input(hand, INPUT_GRIP_RELEASE)
         
         # Кнопка Menu
-        controller.button_menu.pressed = lambda: self.on_menu_press(hand)
+        controller.button_menu.pressed = lambda: self.dispatch_input(hand, INPUT_MENU_PRESS)
         
         # Джойстик
-        controller.joy_x_changed = lambda x: self.on_joystick_move(hand, x, controller.joy_y)
-        controller.joy_y_changed = lambda y: self.on_joystick_move(hand, controller.joy_x, y)
+        controller.joy_x_changed = lambda x: self.dispatch_joystick(hand, x, controller.joy_y)
+        controller.joy_y_changed = lambda y: self.dispatch_joystick(hand, controller.joy_x, y)
+    
+    def dispatch_input(self, hand, code):
+        """Єдина точка входу для кнопок (живі контролери та відтворення)"""
+        if self.recorder:
+            self.recorder.record(REC_BUTTON, TRACK_HANDS[hand], code)
+        getattr(self, INPUT_HANDLERS[code])(hand)
+    
+    def dispatch_joystick(self, hand, x, y):
+        if self.recorder:
+            self.recorder.record(REC_JOYSTICK, TRACK_HANDS[hand], 0, (x, y, 0, 0, 0, 0))
+        self.on_joystick_move(hand, x, y)
     
     def on_trigger_press(self, hand):
         """Обробка натискання тригера"""
         print(f"[VR] Trigger pressed on {hand} hand")
+        self.base.audio.play("trigger", priority=2, pos=self.hand_pos(hand))
         
         # Візуальний ефект
         if hand in self.hand_models:
             self.hand_models[hand].setColorScale(0.8, 0.8, 1, 1)
             
             # Аніме-ефект (іскри)
-            if self.config.get("anime_effects", True):
+            if self.game_config.get("anime_effects", True):
                 self.create_spark_effect(hand)
     
     def on_trigger_release(self, hand):
@@ -293,6 +673,7 @@ class VRSystemManager:
     def on_grip_press(self, hand):
         """Обробка натискання Grip"""
         print(f"[VR] Grip pressed on {hand} hand")
+        self.base.audio.play("grip", priority=1, pos=self.hand_pos(hand))
         # Тут можна додати захоплення об'єктів
     
     def on_grip_release(self, hand):
@@ -302,9 +683,13 @@ class VRSystemManager:
     def on_menu_press(self, hand):
         """Обробка натискання Menu"""
         print(f"[VR] Menu pressed on {hand} hand")
+        self.base.audio.play("menu", priority=3)
         # Відкриваємо меню
         self.base.show_pause_menu()
     
+    def hand_pos(self, hand):
+        return (self.left_hand if hand == 'left' else self.right_hand).getPos(render)
+    
     def on_joystick_move(self, hand, x, y):
         """Обробка руху джойстика"""
         if hand == 'left':
@@ -338,27 +723,54 @@ class VRSystemManager:
         if not self.vr_initialized:
             return task.cont
         
-        # Оновлюємо позиції рук з OpenXR
-        try:
-            # Отримуємо позиції трекінгу
-            for hand_name, controller in self.vr_controllers.items():
-                if hand_name == 'left':
-                    self.left_hand.setPos(controller.getPos())
-                    self.left_hand.setHpr(controller.getHpr())
-                else:
-                    self.right_hand.setPos(controller.getPos())
-                    self.right_hand.setHpr(controller.getHpr())
-            
-            # Оновлюємо позицію голови
-            if self.base.openXR.get_hmd():
-                self.head.setPos(self.base.openXR.get_hmd().getPos())
-                self.head.setHpr(self.base.openXR.get_hmd().getHpr())
+        if self.replay:
+            self.update_replay()
+        else:
+            # Оновлюємо позиції рук з OpenXR
+            try:
+                # Отримуємо позиції трекінгу
+                for hand_name, controller in self.vr_controllers.items():
+                    self.apply_pose(TRACK_HANDS[hand_name], controller.getPos(), controller.getHpr())
                 
-        except Exception as e:
-            # Ігноруємо помилки трекінгу
-            pass
+                # Оновлюємо позицію голови
+                hmd = self.base.openXR.get_hmd()
+                if hmd:
+                    self.apply_pose(TRACK_HEAD, hmd.getPos(), hmd.getHpr())
+                    
+            except Exception as e:
+                # Ігноруємо помилки трекінгу
+                pass
+        
+        if self.recorder:
+            self.recorder.end_frame()
         
         return task.cont
+    
+    def apply_pose(self, source, pos, hpr):
+        """Застосування пози трекінгу до голови або руки"""
+        entity_id = self.tracked_ids[source]
+        self.base.entities.set_pos(entity_id, pos[0], pos[1], pos[2])
+        self.base.entities.set_hpr(entity_id, hpr[0], hpr[1], hpr[2])
+        if self.recorder:
+            self.recorder.record(REC_POSE, source, 0, (pos[0], pos[1], pos[2], hpr[0], hpr[1], hpr[2]))
+    
+    def update_replay(self):
+        """Подача записаного кадру в ті самі обробники, що й живий трекінг"""
+        self.replay.frame_times.append(globalClock.getDt())
+        for _, _, kind, source, code, *values in self.replay.next_frame():
+            if kind == REC_POSE:
+                self.apply_pose(source, Point3(*values[:3]), Vec3(*values[3:]))
+            elif kind == REC_BUTTON:
+                self.dispatch_input(TRACK_HAND_NAMES[source], code)
+            elif kind == REC_JOYSTICK:
+                self.dispatch_joystick(TRACK_HAND_NAMES[source], values[0], values[1])
+        
+        if self.replay.finished:
+            print("[REPLAY] Відтворення завершено")
+            self.replay.report()
+            self.replay = None
+            if self.base.headless:
+                self.base.userExit()
 
 # ============================================
 # LOADING SCREEN (VR сумісний)
@@ -392,20 +804,20 @@ class LoadingScreen:
         # Текст в 3D
         self.logo_text = TextNode('logo')
         self.logo_text.setText("⚡ SAO VR ⚡")
-        self.logo_text.setFont(loader.loadFont("cmss12"))
+        self.logo_text.setFont(loader.loadFont(baked("cmss12")))
         self.logo_node = self.loading_root.attachNewNode(self.logo_text)
         self.logo_node.setScale(2)
         self.logo_node.setPos(-5, 0, 5)
         
         # Прогрес-бар в 3D
-        self.progress_bar = loader.loadModel("models/box")
+        self.progress_bar = loader.loadModel(baked("models/box"))
         self.progress_bar.setScale(10, 0.5, 0.5)
         self.progress_bar.setColor(0, 0.5, 1, 1)
         self.progress_bar.setPos(-5, 0, 2)
         self.progress_bar.reparentTo(self.loading_root)
         
         # Фон
-        background = loader.loadModel("models/box")
+        background = loader.loadModel(baked("models/box"))
         background.setScale(12, 0.1, 8)
         background.setColor(0, 0, 0, 0.8)
         background.setPos(-5, -1, 4)
@@ -462,9 +874,1643 @@ class LoadingScreen:
         return task.done
     
     def show_main_menu(self, task):
-        MainMenu(self.base)
+        if self.base.vr_manager.replay:
+            # Відтворення запускає симуляцію одразу, без меню
+            self.base.start_simulation()
+        else:
+            MainMenu(self.base)
         return task.done
 
+# ============================================
+# ENTITY STORE (struct-of-arrays + dirty-біти)
+# ============================================
+class EntityStore:
+    """Компактне сховище сутностей світу; рендер-вузли оновлюються лише для змінених"""
+
+    DIRTY_TRANSFORM = 1
+    DIRTY_COLOR = 2
+    DIRTY_FLAGS = 4
+    DIRTY_ALL = DIRTY_TRANSFORM | DIRTY_COLOR | DIRTY_FLAGS
+
+    FLAG_ALIVE = 1
+    FLAG_VISIBLE = 2
+    FLAG_STATIC = 4
+    FLAG_TINTED = 8  # колір задано явно (інакше вузол зберігає власні кольори)
+
+    SLOT_BITS = 24
+    SLOT_MASK = (1 << SLOT_BITS) - 1
+
+    def __init__(self):
+        # Один масив на поле; слот сутності - індекс у кожному з них
+        self.ids = array('I')
+        self.pos = array('f')  # x, y, z
+        self.hpr = array('f')  # h, p, r
+        self.scale = array('f')  # sx, sy, sz
+        self.color = array('f')  # r, g, b, a
+        self.flags = array('B')
+        self.dirty = array('B')
+        self.nodes = []  # прив'язані рендер-вузли (або None)
+        self.watchers = {}  # слот -> виклик після зміни трансформації вузла
+        self.dirty_slots = []
+        self.free_slots = []
+        self.alive_count = 0
+
+    def __len__(self):
+        return self.alive_count
+
+    def create(self, pos=(0, 0, 0), hpr=(0, 0, 0), scale=(1, 1, 1), color=None,
+               flags=FLAG_VISIBLE):
+        """Створення сутності; повертає її id (слот + покоління)"""
+        if color is None:
+            color = (1, 1, 1, 1)
+        else:
+            flags |= self.FLAG_TINTED
+        if self.free_slots:
+            slot = self.free_slots.pop()
+            generation = ((self.ids[slot] >> self.SLOT_BITS) + 1) & 0xFF
+            entity_id = (generation << self.SLOT_BITS) | slot
+            self.ids[slot] = entity_id
+            self.pos[slot * 3:slot * 3 + 3] = array('f', pos)
+            self.hpr[slot * 3:slot * 3 + 3] = array('f', hpr)
+            self.scale[slot * 3:slot * 3 + 3] = array('f', scale)
+            self.color[slot * 4:slot * 4 + 4] = array('f', color)
+            self.flags[slot] = flags | self.FLAG_ALIVE
+            self.nodes[slot] = None
+        else:
+            slot = len(self.ids)
+            if slot > self.SLOT_MASK:
+                raise OverflowError("Забагато сутностей у сховищі")
+            entity_id = slot
+            self.ids.append(entity_id)
+            self.pos.extend(pos)
+            self.hpr.extend(hpr)
+            self.scale.extend(scale)
+            self.color.extend(color)
+            self.flags.append(flags | self.FLAG_ALIVE)
+            self.dirty.append(0)
+            self.nodes.append(None)
+
+        self.alive_count += 1
+        self.mark(slot, self.DIRTY_ALL)
+        return entity_id
+
+    def destroy(self, entity_id):
+        """Видалення сутності; прив'язаний вузол видаляється разом з нею"""
+        slot = self.slot(entity_id)
+        node = self.nodes[slot]
+        if node is not None:
+            node.removeNode()
+        self.nodes[slot] = None
+        self.watchers.pop(slot, None)
+        self.flags[slot] = 0
+        self.dirty[slot] = 0
+        self.free_slots.append(slot)
+        self.alive_count -= 1
+
+    def slot(self, entity_id):
+        slot = entity_id & self.SLOT_MASK
+        if slot >= len(self.ids) or self.ids[slot] != entity_id or not self.flags[slot] & self.FLAG_ALIVE:
+            raise KeyError(f"Сутність {entity_id} не існує")
+        return slot
+
+    def is_alive(self, entity_id):
+        slot = entity_id & self.SLOT_MASK
+        return (slot < len(self.ids) and self.ids[slot] == entity_id
+                and bool(self.flags[slot] & self.FLAG_ALIVE))
+
+    def mark(self, slot, bits):
+        if not self.dirty[slot]:
+            self.dirty_slots.append(slot)
+        self.dirty[slot] |= bits
+
+    def bind(self, entity_id, node):
+        """Прив'язка рендер-вузла; поточний стан застосовується одразу"""
+        slot = self.slot(entity_id)
+        self.nodes[slot] = node
+        self.apply(slot, self.DIRTY_ALL)
+        self.dirty[slot] = 0
+
+    def get_node(self, entity_id):
+        return self.nodes[self.slot(entity_id)]
+
+    def watch(self, entity_id, callback):
+        """Виклик після кожного перенесення нової трансформації у вузол (напр. для LOD-кешів)"""
+        self.watchers[self.slot(entity_id)] = callback
+
+    def get_pos(self, entity_id):
+        i = self.slot(entity_id) * 3
+        return Vec3(self.pos[i], self.pos[i + 1], self.pos[i + 2])
+
+    def set_pos(self, entity_id, x, y, z):
+        slot = self.slot(entity_id)
+        i = slot * 3
+        self.pos[i] = x
+        self.pos[i + 1] = y
+        self.pos[i + 2] = z
+        self.mark(slot, self.DIRTY_TRANSFORM)
+
+    def get_hpr(self, entity_id):
+        i = self.slot(entity_id) * 3
+        return Vec3(self.hpr[i], self.hpr[i + 1], self.hpr[i + 2])
+
+    def set_hpr(self, entity_id, h, p, r):
+        slot = self.slot(entity_id)
+        i = slot * 3
+        self.hpr[i] = h
+        self.hpr[i + 1] = p
+        self.hpr[i + 2] = r
+        self.mark(slot, self.DIRTY_TRANSFORM)
+
+    def set_scale(self, entity_id, sx, sy, sz):
+        slot = self.slot(entity_id)
+        i = slot * 3
+        self.scale[i] = sx
+        self.scale[i + 1] = sy
+        self.scale[i + 2] = sz
+        self.mark(slot, self.DIRTY_TRANSFORM)
+
+    def get_color(self, entity_id):
+        i = self.slot(entity_id) * 4
+        return Vec4(self.color[i], self.color[i + 1], self.color[i + 2], self.color[i + 3])
+
+    def set_color(self, entity_id, r, g, b, a=1):
+        slot = self.slot(entity_id)
+        i = slot * 4
+        self.color[i] = r
+        self.color[i + 1] = g
+        self.color[i + 2] = b
+        self.color[i + 3] = a
+        self.flags[slot] |= self.FLAG_TINTED
+        self.mark(slot, self.DIRTY_COLOR)
+
+    def has_flag(self, entity_id, flag):
+        return bool(self.flags[self.slot(entity_id)] & flag)
+
+    def set_flag(self, entity_id, flag, enabled=True):
+        slot = self.slot(entity_id)
+        if enabled:
+            self.flags[slot] |= flag
+        else:
+            self.flags[slot] &= ~flag & 0xFF
+        self.mark(slot, self.DIRTY_FLAGS)
+
+    def apply(self, slot, bits):
+        """Перенесення стану слота в рендер-вузол"""
+        node = self.nodes[slot]
+        if node is None:
+            return
+        if bits & self.DIRTY_TRANSFORM:
+            i = slot * 3
+            pos, hpr, scale = self.pos, self.hpr, self.scale
+            node.setPosHprScale(pos[i], pos[i + 1], pos[i + 2],
+                                hpr[i], hpr[i + 1], hpr[i + 2],
+                                scale[i], scale[i + 1], scale[i + 2])
+            if self.watchers and slot in self.watchers:
+                self.watchers[slot]()
+        if bits & self.DIRTY_COLOR and self.flags[slot] & self.FLAG_TINTED:
+            i = slot * 4
+            color = self.color
+            node.setColor(color[i], color[i + 1], color[i + 2], color[i + 3])
+        if bits & self.DIRTY_FLAGS:
+            if self.flags[slot] & self.FLAG_VISIBLE:
+                node.show()
+            else:
+                node.hide()
+
+    def sync(self):
+        """Синхронізація лише змінених сутностей; повертає їх кількість"""
+        dirty_slots = self.dirty_slots
+        dirty = self.dirty
+        count = 0
+        for slot in dirty_slots:
+            # bind()/destroy() обнуляють біти, не чіпаючи списку: такий слот уже чистий
+            # (або доданий удруге після обнулення) - пропускаємо
+            bits = dirty[slot]
+            if not bits:
+                continue
+            self.apply(slot, bits)
+            dirty[slot] = 0
+            count += 1
+        self.dirty_slots = []
+        return count
+
+    def sync_task(self, task):
+        self.sync()
+        return task.cont
+
+    def nbytes(self):
+        """Пам'ять масивів сховища (без самих рендер-вузлів)"""
+        total = sum(a.itemsize * len(a) for a in (self.ids, self.pos, self.hpr, self.scale,
+                                                   self.color, self.flags, self.dirty))
+        return total + 8 * len(self.nodes)
+
+def benchmark_entity_store(count=100000, changed_fractions=(0.01, 0.1, 1.0)):
+    """Бенчмарк пам'яті та вартості синхронізації сховища сутностей"""
+    store = EntityStore()
+    start = time.perf_counter()
+    for i in range(count):
+        store.create(pos=(i % 1000, i // 1000, 0), color=(1, 1, 1, 1))
+    create_time = time.perf_counter() - start
+    print(f"[BENCH] {count} сутностей створено за {create_time * 1000:.1f} мс")
+    print(f"[BENCH] Пам'ять сховища: {store.nbytes() / count:.1f} байт/сутність")
+
+    # Синхронізація без рендер-вузлів (чиста вартість даних)
+    store.sync()
+    for fraction in changed_fractions:
+        step = max(1, int(1 / fraction))
+        for entity_id in range(0, count, step):
+            store.set_pos(entity_id, 1, 2, 3)
+        start = time.perf_counter()
+        synced = store.sync()
+        print(f"[BENCH] sync без вузлів: {synced} змінених за {(time.perf_counter() - start) * 1000:.2f} мс")
+
+    # Синхронізація з рендер-вузлами
+    root = NodePath("BenchRoot")
+    start = time.perf_counter()
+    for entity_id in range(count):
+        store.bind(entity_id, root.attachNewNode("E"))
+    print(f"[BENCH] Прив'язка {count} вузлів за {(time.perf_counter() - start) * 1000:.1f} мс")
+
+    for fraction in changed_fractions:
+        step = max(1, int(1 / fraction))
+        for entity_id in range(0, count, step):
+            store.set_pos(entity_id, 4, 5, 6)
+        start = time.perf_counter()
+        synced = store.sync()
+        print(f"[BENCH] sync з вузлами: {synced} змінених за {(time.perf_counter() - start) * 1000:.2f} мс")
+
+    # Кадр без змін має коштувати майже нуль
+    start = time.perf_counter()
+    store.sync()
+    print(f"[BENCH] sync без змін: {(time.perf_counter() - start) * 1000:.3f} мс")
+    root.removeNode()
+
+# ============================================
+# LOD QUADTREE (рівні деталізації світу)
+# ============================================
+def count_triangles(nodepath):
+    """Підрахунок трикутників у піддереві (приховані вузли не рахуються)"""
+    total = 0
+    for geom_np in nodepath.findAllMatches("**/+GeomNode"):
+        geom_node = geom_np.node()
+        for i in range(geom_node.getNumGeoms()):
+            for prim in geom_node.getGeom(i).getPrimitives():
+                if prim.getPrimitiveType() == GeomPrimitive.PT_polygons:
+                    total += prim.decompose().getNumPrimitives()
+    return total
+
+def build_cross_proxy(model, space):
+    """Грубий рівень: два перехресні двосторонні квади за габаритами моделі (4 трикутники).
+    Повертає (NodePath поруч із моделлю, геометрична похибка в одиницях space - простору LOD дерева)"""
+    parent = model.getParent()
+    low, high = model.getTightBounds(parent)
+    center = (low + high) * 0.5
+    card = CardMaker("ProxyCard")
+    card.setHasNormals(True)
+
+    proxy = parent.attachNewNode("Proxy")
+    card.setFrame(low.x, high.x, low.z, high.z)
+    front = proxy.attachNewNode(card.generate())
+    front.setY(center.y)
+    card.setFrame(low.y, high.y, low.z, high.z)
+    side = proxy.attachNewNode(card.generate())
+    side.setH(90)
+    side.setX(center.x)
+    proxy.setTwoSided(True)
+    proxy.flattenStrong()
+
+    # Найдальша точка моделі лежить не далі півгабариту від найближчого квада;
+    # габарити в просторі дерева, бо там же міряється відстань до очей (масштаб Prop враховано)
+    low, high = model.getTightBounds(space)
+    error = max(high.x - low.x, high.y - low.y) * 0.5
+    return proxy, error
+
+class LODItem:
+    """Статичний об'єкт світу з набором готових рівнів деталізації"""
+
+    def __init__(self, root, levels, errors, center, radius):
+        self.root = root  # вузол, під яким лежать усі рівні
+        self.levels = levels  # [повна деталізація, ..., найгрубіший рівень]
+        self.errors = errors  # геометрична похибка кожного рівня (метри)
+        self.center = center
+        self.radius = radius
+        self.triangles = [count_triangles(level) for level in levels]
+        self.level = 0
+        self.node = None  # листовий вузол quadtree
+
+    def update_bounds(self, parent):
+        low, high = self.levels[0].getTightBounds(parent)
+        self.center = (low + high) * 0.5
+        self.radius = (high - low).length() * 0.5
+
+class LODQuadNode:
+    """Вузол quadtree: або набір об'єктів, або чотири нащадки"""
+
+    def __init__(self, parent_np, name, parent=None):
+        self.np = parent_np.attachNewNode(name)
+        self.parent = parent
+        self.content = self.np.attachNewNode("Content")  # повна деталізація
+        self.impostor = None  # об'єднаний батч для далекого кластера
+        self.impostor_triangles = 0
+        self.children = []
+        self.items = []
+        self.center = Point3(0, 0, 0)
+        self.radius = 0.0
+        self.impostor_error = 0.0
+        self.item_count = 0
+        self.collapsed = False
+
+    def all_items(self):
+        items = list(self.items)
+        for child in self.children:
+            items.extend(child.all_items())
+        return items
+
+class LODQuadtree:
+    """Quadtree LOD: вибір рівня деталізації за похибкою в пікселях відносно HMD/камери"""
+
+    def __init__(self, base, parent, pixel_error=2.0, max_swaps=8,
+                 max_items=4, max_depth=6, impostor_error=0.02, hysteresis=0.25):
+        self.base = base
+        self.parent = parent
+        self.pixel_error = pixel_error
+        # Спрощення лише при похибці нижче pixel_error * (1 - hysteresis), уточнення - вище pixel_error
+        self.hysteresis = hysteresis
+        self.max_swaps = max_swaps
+        self.max_items = max_items
+        self.max_depth = max_depth
+        self.impostor_error = impostor_error  # частка радіуса кластера, яку «коштує» злиття
+        self.pending_items = []
+        self.root = None
+        self.stats = {
+            "triangles_drawn": 0,
+            "triangles_full": 0,
+            "nodes_drawn": 0,
+            "nodes_total": 0,
+            "swaps": 0
+        }
+
+    def add(self, levels, errors=None, root=None):
+        """Додавання об'єкта; levels - готові NodePath від повної до найгрубішої деталізації.
+        Якщо задано root, рівні вже лежать під ним (root несе трансформацію об'єкта)"""
+        if errors is None:
+            errors = [0.0] * len(levels)
+        if len(errors) != len(levels):
+            raise ValueError("Кількість похибок LOD не збігається з кількістю рівнів")
+
+        if root is None:
+            root = NodePath("LODItem")
+            for level in levels:
+                level.reparentTo(root)
+        for level in levels[1:]:
+            level.stash()
+
+        item = LODItem(root, levels, errors, Point3(0, 0, 0), 0.0)
+        item.update_bounds(self.parent)
+        self.pending_items.append(item)
+        return item
+
+    def build(self):
+        """Побудова дерева з доданих об'єктів"""
+        items = self.pending_items
+        self.pending_items = []
+        if not items:
+            return
+
+        min_x = min(item.center.x - item.radius for item in items)
+        max_x = max(item.center.x + item.radius for item in items)
+        min_y = min(item.center.y - item.radius for item in items)
+        max_y = max(item.center.y + item.radius for item in items)
+
+        self.root = self.build_node(self.parent, "LODRoot", items,
+                                    (min_x + max_x) * 0.5, (min_y + max_y) * 0.5,
+                                    max(max_x - min_x, max_y - min_y) * 0.5, 0)
+
+        self.stats["nodes_total"] = len(items)
+        self.stats["triangles_full"] = sum(item.triangles[0] for item in items)
+
+    def build_node(self, parent_np, name, items, cx, cy, half, depth, parent=None):
+        node = LODQuadNode(parent_np, name, parent)
+
+        if len(items) <= self.max_items or depth >= self.max_depth:
+            node.items = items
+            for item in items:
+                item.root.reparentTo(node.content)
+                item.node = node
+        else:
+            quadrants = [[], [], [], []]
+            for item in items:
+                index = (1 if item.center.x >= cx else 0) + (2 if item.center.y >= cy else 0)
+                quadrants[index].append(item)
+
+            quarter = half * 0.5
+            for index, quadrant in enumerate(quadrants):
+                if quadrant:
+                    qx = cx + (quarter if index & 1 else -quarter)
+                    qy = cy + (quarter if index & 2 else -quarter)
+                    node.children.append(self.build_node(node.content, f"{name}_{index}",
+                                                         quadrant, qx, qy, quarter, depth + 1, node))
+
+        self.update_bounds(node)
+        return node
+
+    def update_bounds(self, node):
+        """Обмежувальна сфера кластера"""
+        subtree = node.all_items()
+        node.item_count = len(subtree)
+        center = Point3(0, 0, 0)
+        for item in subtree:
+            center += item.center
+        center /= len(subtree)
+        node.center = center
+        node.radius = max((item.center - center).length() + item.radius for item in subtree)
+        node.impostor_error = (max(item.errors[-1] for item in subtree)
+                               + node.radius * self.impostor_error)
+
+    def build_impostor(self, node):
+        """Злиття найгрубіших рівнів кластера в один батч (стан вузлів запікається у вершини)"""
+        impostor = NodePath("Impostor")
+        for item in node.all_items():
+            coarse = item.levels[-1]
+            copy = coarse.copyTo(impostor)
+            copy.setState(coarse.getNetState())
+            copy.setMat(coarse.getMat(node.np))
+        impostor.flattenStrong()
+        impostor.reparentTo(node.np)
+        impostor.stash()
+        node.impostor = impostor
+        node.impostor_triangles = count_triangles(impostor)
+
+    def invalidate(self, item):
+        """Об'єкт перемістився: оновлення меж і скидання застарілих імпосторів над ним"""
+        item.update_bounds(self.parent)
+        node = item.node
+        while node is not None:
+            if node.impostor is not None:
+                node.impostor.removeNode()
+                node.impostor = None
+                if node.collapsed:
+                    node.content.unstash()
+                    node.collapsed = False
+            self.update_bounds(node)
+            node = node.parent
+
+    def get_eye_pos(self):
+        """Позиція очей: HMD у VR, інакше десктоп-камера"""
+        vr_manager = getattr(self.base, 'vr_manager', None)
+        if vr_manager and vr_manager.vr_initialized:
+            return vr_manager.head.getPos(self.parent)
+        return self.base.camera.getPos(self.parent)
+
+    def projection_factor(self):
+        """Кількість пікселів на метр на відстані 1 м"""
+        height = self.base.win.getYSize() if self.base.win else 1080
+        fov = self.base.camLens.getFov()[1]
+        return height / (2.0 * math.tan(math.radians(fov) * 0.5))
+
+    def screen_error(self, error, distance, k):
+        return error * k / max(distance, 0.1)
+
+    def select(self, node, eye, k, swaps):
+        """Обхід дерева та збір потрібних перемикань"""
+        distance = (node.center - eye).length() - node.radius
+        threshold = self.pixel_error if node.collapsed else self.pixel_error * (1.0 - self.hysteresis)
+        collapse = (node.item_count > 1 and
+                    self.screen_error(node.impostor_error, distance, k) <= threshold)
+
+        if collapse != node.collapsed:
+            # Уточнення деталізації має пріоритет над спрощенням
+            current_error = self.screen_error(node.impostor_error, distance, k) if node.collapsed else 0.0
+            swaps.append((not collapse, current_error, node, collapse))
+        if collapse:
+            return
+
+        for item in node.items:
+            item_distance = (item.center - eye).length() - item.radius
+            level = 0
+            for i in range(len(item.levels) - 1, -1, -1):
+                threshold = self.pixel_error if i <= item.level else self.pixel_error * (1.0 - self.hysteresis)
+                if self.screen_error(item.errors[i], item_distance, k) <= threshold:
+                    level = i
+                    break
+            if level != item.level:
+                current_error = self.screen_error(item.errors[item.level], item_distance, k)
+                swaps.append((level < item.level, current_error, item, level))
+
+        for child in node.children:
+            self.select(child, eye, k, swaps)
+
+    def apply_swap(self, target, value):
+        if isinstance(target, LODQuadNode):
+            if value:
+                if target.impostor is None:
+                    self.build_impostor(target)
+                target.content.stash()
+                target.impostor.unstash()
+            else:
+                target.impostor.stash()
+                target.content.unstash()
+            target.collapsed = value
+        else:
+            target.levels[target.level].stash()
+            target.levels[value].unstash()
+            target.level = value
+
+    def count_drawn(self, node):
+        if node.collapsed:
+            return node.impostor_triangles, 1
+        triangles = sum(item.triangles[item.level] for item in node.items)
+        nodes = len(node.items)
+        for child in node.children:
+            child_triangles, child_nodes = self.count_drawn(child)
+            triangles += child_triangles
+            nodes += child_nodes
+        return triangles, nodes
+
+    def update(self, task):
+        """Оновлення LOD один раз за кадр"""
+        if self.root is None:
+            return task.cont
+
+        swaps = []
+        self.select(self.root, self.get_eye_pos(), self.projection_factor(), swaps)
+        swaps.sort(key=lambda swap: (swap[0], swap[1]), reverse=True)
+
+        for _, _, target, value in swaps[:self.max_swaps]:
+            self.apply_swap(target, value)
+
+        triangles, nodes = self.count_drawn(self.root)
+        self.stats["triangles_drawn"] = triangles
+        self.stats["nodes_drawn"] = nodes
+        self.stats["swaps"] = min(len(swaps), self.max_swaps)
+        return task.cont
+
+# ============================================
+# BAKED LIGHTING (статичне освітлення в кольори вершин)
+# ============================================
+LIGHTING_CACHE_DIR = os.path.join("cache", "lighting")
+LIGHTING_BAKE_VERSION = 3
+LIGHTING_CACHE_KEEP = 4  # скільки останніх запікань тримати на диску
+
+def focus_cells(focus, cell):
+    """Клітинки сітки (ребро cell), які зачіпають AABB сфер focus [(центр, досяжність)]"""
+    cells = set()
+    for center, reach in focus:
+        low = [math.floor((c - reach) / cell) for c in center]
+        high = [math.floor((c + reach) / cell) for c in center]
+        for x in range(low[0], high[0] + 1):
+            for y in range(low[1], high[1] + 1):
+                for z in range(low[2], high[2] + 1):
+                    cells.add((x, y, z))
+    return cells
+
+def near_focus(points, focus, cells, cell):
+    """Чи перетинає AABB трикутника хоча б одну сферу focus (спершу через хеш клітинок)"""
+    low = [min(p[axis] for p in points) for axis in range(3)]
+    high = [max(p[axis] for p in points) for axis in range(3)]
+    first = [math.floor(value / cell) for value in low]
+    last = [math.floor(value / cell) for value in high]
+    if (last[0] - first[0] + 1) * (last[1] - first[1] + 1) * (last[2] - first[2] + 1) <= len(focus):
+        return any((x, y, z) in cells
+                   for x in range(first[0], last[0] + 1)
+                   for y in range(first[1], last[1] + 1)
+                   for z in range(first[2], last[2] + 1))
+    # Великий трикутник: дешевше перевірити сфери напряму
+    for center, reach in focus:
+        distance_sq = 0.0
+        for axis in range(3):
+            offset = max(low[axis] - center[axis], 0.0, center[axis] - high[axis])
+            distance_sq += offset * offset
+        if distance_sq <= reach * reach:
+            return True
+    return False
+
+def tessellate(geom, mat, max_edge, focus, cells):
+    """Поділ найдовших ребер трикутників, доки жодне не довше max_edge (світові метри), лише
+    поблизу сфер focus - там, де AO змінює освітлення.
+    Освітлення запікається у вершини, тож великі площини (підлога, сітка) без поділу не мають AO.
+    Підтримуються geom з одним масивом float32-колонок (так завантажуються .egg/.bam гри);
+    повертає (рядки вершин, індекси трикутників) або None, якщо нічого не поділено."""
+    import numpy as np
+
+    vdata = geom.getVertexData()
+    vertex_format = vdata.getFormat()
+    array_format = vertex_format.getArray(0)
+    if (vertex_format.getNumArrays() != 1 or array_format.getStride() % 4 or
+            any(array_format.getColumn(i).getNumericType() != Geom.NT_float32
+                for i in range(array_format.getNumColumns()))):
+        return None
+
+    triangles = []
+    for prim in geom.getPrimitives():
+        if prim.getPrimitiveType() != GeomPrimitive.PT_polygons:
+            return None
+        prim = prim.decompose()
+        indices = [prim.getVertex(i) for i in range(prim.getNumVertices())]
+        triangles.extend(zip(indices[0::3], indices[1::3], indices[2::3]))
+
+    rows = np.frombuffer(vdata.getArray(0).getHandle().getData(), dtype=np.float32)
+    rows = rows.reshape(-1, array_format.getStride() // 4).tolist()
+    vertex_start = vertex_format.getColumn(InternalName.getVertex()).getStart() // 4
+    world = [tuple(mat.xformPoint(Point3(*row[vertex_start:vertex_start + 3]))) for row in rows]
+
+    # Bisection найдовшого ребра; спільні середини ребер - спільні вершини
+    cell = max_edge
+    midpoints = {}
+    result = []
+    while triangles:
+        tri = triangles.pop()
+        points = [world[i] for i in tri]
+        lengths = [math.dist(points[i], points[(i + 1) % 3]) for i in range(3)]
+        longest = lengths.index(max(lengths))
+        if lengths[longest] <= max_edge or not near_focus(points, focus, cells, cell):
+            result.append(tri)
+            continue
+        a, b, c = tri[longest], tri[(longest + 1) % 3], tri[(longest + 2) % 3]
+        key = (a, b) if a < b else (b, a)
+        middle = midpoints.get(key)
+        if middle is None:
+            middle = len(rows)
+            midpoints[key] = middle
+            rows.append([(x + y) * 0.5 for x, y in zip(rows[a], rows[b])])
+            world.append(tuple((x + y) * 0.5 for x, y in zip(world[a], world[b])))
+        triangles.append((a, middle, c))
+        triangles.append((middle, b, c))
+
+    if not midpoints:
+        return None
+    rows = np.array(rows, dtype=np.float32)
+    if vertex_format.hasColumn(InternalName.getNormal()):
+        start = vertex_format.getColumn(InternalName.getNormal()).getStart() // 4
+        normals = rows[:, start:start + 3]
+        normals /= np.maximum(np.linalg.norm(normals, axis=1, keepdims=True), 1e-6)
+    return rows, np.array(result, dtype=np.uint32)
+
+def replace_geom(geom_node, index, rows, triangles):
+    """Заміна geom на поділений: той самий формат вершин, нові рядки і трикутники"""
+    vdata = GeomVertexData(geom_node.getGeom(index).getVertexData())
+    vdata.setNumRows(len(rows))
+    vdata.modifyArray(0).modifyHandle().setData(rows.tobytes())
+    prim = GeomTriangles(Geom.UH_static)
+    prim.setIndexType(Geom.NT_uint32)
+    prim.modifyVertices().modifyHandle().setData(triangles.tobytes())
+    geom = Geom(vdata)
+    geom.addPrimitive(prim)
+    geom_node.setGeom(index, geom)
+
+class LightingBaker:
+    """CPU-запікання освітлення статичної геометрії (NumPy) з кешем на диску"""
+
+    def __init__(self, light_nodes, ao_strength=0.6, ao_range=3.0, max_edge=1.0, cache_dir=LIGHTING_CACHE_DIR):
+        self.light_nodes = light_nodes  # NodePath наявних джерел світла
+        self.ao_strength = ao_strength
+        self.ao_range = ao_range  # радіус впливу сусідів на AO (метри)
+        self.max_edge = max_edge  # найдовше ребро після поділу (метри)
+        self.cache_dir = cache_dir
+
+    def light_params(self):
+        """Параметри джерел у світових координатах"""
+        params = []
+        for light_np in self.light_nodes:
+            light = light_np.node()
+            color = light.getColor()
+            if isinstance(light, AmbientLight):
+                params.append(("ambient", tuple(color)))
+            elif isinstance(light, DirectionalLight):
+                direction = light_np.getMat(render).xformVec(light.getDirection())
+                direction.normalize()
+                params.append(("directional", tuple(color), tuple(direction)))
+            elif isinstance(light, PointLight):
+                params.append(("point", tuple(color), tuple(light_np.getPos(render)),
+                               tuple(light.getAttenuation())))
+        return params
+
+    def collect(self, nodes):
+        """Геометрія для запікання: (GeomNode NodePath, індекс geom, позиції, нормалі, колір)"""
+        entries = []
+        for node in nodes:
+            color = node.getColor() if node.hasColor() else Vec4(1, 1, 1, 1)
+            # Разом зі схованими рівнями LOD
+            for geom_np in node.findAllMatches("**/+GeomNode;+s"):
+                mat = geom_np.getMat(render)
+                geom_node = geom_np.node()
+                for i in range(geom_node.getNumGeoms()):
+                    vdata = geom_node.getGeom(i).getVertexData()
+                    if not vdata.hasColumn("normal"):
+                        continue
+                    positions = []
+                    normals = []
+                    vertex_reader = GeomVertexReader(vdata, "vertex")
+                    normal_reader = GeomVertexReader(vdata, "normal")
+                    while not vertex_reader.isAtEnd():
+                        positions.append(tuple(mat.xformPoint(vertex_reader.getData3())))
+                        normals.append(tuple(normal_reader.getData3()))
+                    entries.append((geom_np, i, positions, normals, tuple(color), mat))
+        return entries
+
+    def cache_key(self, entries):
+        """Ключ кешу: геометрія до поділу у світових координатах + світло + AO (кольори вузлів не входять)"""
+        digest = hashlib.sha1(repr((LIGHTING_BAKE_VERSION, self.light_params(),
+                                    self.ao_strength, self.ao_range, self.max_edge)).encode())
+        for _, _, positions, normals, _, _ in entries:
+            digest.update(repr((positions, normals)).encode())
+        return digest.hexdigest()
+
+    def compute(self, entries):
+        """Освітлення вершин (RGB без кольору вузла): ambient з AO + Ламберт для спрямованого і точкового світла"""
+        import numpy as np
+
+        # Сфери-оклюдери: по одній на кожен об'єкт
+        spheres = []
+        for index, (_, _, positions, _, _, _) in enumerate(entries):
+            points = np.array(positions, dtype=np.float32)
+            center = points.mean(axis=0)
+            spheres.append((index, center, float(np.linalg.norm(points - center, axis=1).max())))
+
+        results = []
+        for index, (_, _, positions, normals, _, mat) in enumerate(entries):
+            points = np.array(positions, dtype=np.float32)
+            # Нормалі трансформуються оберненою транспонованою матрицею (Panda: рядкові вектори)
+            linear = np.array([[mat.getCell(r, c) for c in range(3)] for r in range(3)], dtype=np.float32)
+            world_normals = np.array(normals, dtype=np.float32) @ np.linalg.inv(linear).T
+            world_normals /= np.maximum(np.linalg.norm(world_normals, axis=1, keepdims=True), 1e-6)
+
+            # Ambient occlusion від сусідніх об'єктів (великі площини на кшталт підлоги не враховуються)
+            occlusion = np.zeros(len(points), dtype=np.float32)
+            for other, center, radius in spheres:
+                if other == index or radius <= 0 or radius > self.ao_range:
+                    continue
+                offset = center - points
+                distance = np.linalg.norm(offset, axis=1)
+                near = distance < radius + self.ao_range
+                if not near.any():
+                    continue
+                distance = np.maximum(distance, radius * 0.5)
+                cosine = np.clip((offset * world_normals).sum(axis=1) / distance, 0.0, 1.0)
+                occlusion += np.where(near, (radius * radius) / (distance * distance) * cosine, 0.0)
+            visibility = 1.0 - self.ao_strength * np.clip(occlusion, 0.0, 1.0)
+
+            light = np.zeros((len(points), 3), dtype=np.float32)
+            for param in self.light_params():
+                rgb = np.array(param[1][:3], dtype=np.float32)
+                if param[0] == "ambient":
+                    light += visibility[:, None] * rgb
+                elif param[0] == "directional":
+                    to_light = -np.array(param[2], dtype=np.float32)
+                    lambert = np.clip(world_normals @ to_light, 0.0, None)
+                    light += lambert[:, None] * rgb
+                elif param[0] == "point":
+                    offset = np.array(param[2], dtype=np.float32) - points
+                    distance = np.maximum(np.linalg.norm(offset, axis=1), 1e-6)
+                    lambert = np.clip((offset * world_normals).sum(axis=1) / distance, 0.0, None)
+                    c, l, q = param[3]
+                    attenuation = 1.0 / np.maximum(c + l * distance + q * distance * distance, 1e-6)
+                    light += (lambert * attenuation)[:, None] * rgb
+
+            results.append(light.astype(np.float16))
+        return results
+
+    def modulate(self, light, color):
+        """Кольори вершин: запечене світло * поточний колір вузла"""
+        import numpy as np
+
+        rgba = np.empty((len(light), 4), dtype=np.float32)
+        rgba[:, :3] = np.clip(light * np.array(color[:3], dtype=np.float32), 0.0, 1.0)
+        rgba[:, 3] = color[3]
+        return (rgba * 255 + 0.5).astype(np.uint8)
+
+    def prune_cache(self, keep_path):
+        """Видалення старих запікань, крім LIGHTING_CACHE_KEEP найновіших"""
+        cached = sorted((os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                         if name.endswith(".npz")), key=os.path.getmtime, reverse=True)
+        for path in cached[LIGHTING_CACHE_KEEP:]:
+            if path != keep_path:
+                os.remove(path)
+
+    def write_colors(self, geom_np, index, colors):
+        """Запис кольорів у вершини (копія geom, щоб не зачепити спільну модель)"""
+        geom_node = geom_np.node()
+        geom = geom_node.modifyGeom(index)
+        vdata = geom.getVertexData()
+        if not vdata.hasColumn("color"):
+            vertex_format = GeomVertexFormat(vdata.getFormat())
+            vertex_format.addArray(GeomVertexArrayFormat("color", 4, Geom.NT_uint8, Geom.C_color))
+            vdata = vdata.convertTo(GeomVertexFormat.registerFormat(vertex_format))
+        vdata = GeomVertexData(vdata)
+        writer = GeomVertexWriter(vdata, "color")
+        for r, g, b, a in colors.tolist():
+            writer.setData4i(r, g, b, a)
+        geom.setVertexData(vdata)
+
+    def bake(self, nodes):
+        """Запікання; вузли після цього не освітлюються динамічно"""
+        import numpy as np
+
+        start = time.perf_counter()
+        entries = self.collect(nodes)
+        if not entries:
+            return
+        cache_path = os.path.join(self.cache_dir, self.cache_key(entries) + ".npz")
+
+        lights = None
+        if os.path.exists(cache_path):
+            try:
+                with np.load(cache_path) as cached:
+                    lights = [cached[f"l{i}"] for i in range(len(entries))]
+                    meshes = {i: (cached[f"r{i}"], cached[f"t{i}"])
+                              for i in range(len(entries)) if f"r{i}" in cached}
+                for i, (rows, triangles) in meshes.items():
+                    replace_geom(entries[i][0].node(), entries[i][1], rows, triangles)
+                os.utime(cache_path)  # для prune_cache - використаний нещодавно
+                source = "кеш"
+            except Exception as e:
+                lights = None
+                print(f"[LIGHT] Пошкоджений кеш {cache_path}: {e}")
+        if lights is None:
+            # Вершини потрібні там, куди сягає AO від дрібних оклюдерів (ті самі, що в compute)
+            focus = []
+            for node in nodes:
+                low, high = node.getTightBounds(render)
+                radius = (high - low).length() * 0.5
+                if radius <= self.ao_range:
+                    focus.append((tuple((low + high) * 0.5), radius + self.ao_range))
+            cells = focus_cells(focus, self.max_edge)
+            meshes = {}
+            for i, (geom_np, index, _, _, _, mat) in enumerate(entries):
+                mesh = tessellate(geom_np.node().getGeom(index), mat, self.max_edge, focus, cells)
+                if mesh is not None:
+                    replace_geom(geom_np.node(), index, *mesh)
+                    meshes[i] = mesh
+            if meshes:
+                entries = self.collect(nodes)
+            lights = self.compute(entries)
+            arrays = {f"l{i}": light for i, light in enumerate(lights)}
+            for i, (rows, triangles) in meshes.items():
+                arrays[f"r{i}"] = rows
+                arrays[f"t{i}"] = triangles
+            os.makedirs(self.cache_dir, exist_ok=True)
+            np.savez_compressed(cache_path, **arrays)
+            self.prune_cache(cache_path)
+            source = "обчислено"
+
+        # Колір вузла множиться тут, тож випадкові кольори об'єктів не інвалідують кеш
+        for (geom_np, index, _, _, color, _), light in zip(entries, lights):
+            self.write_colors(geom_np, index, self.modulate(light.astype(np.float32), color))
+
+        for node in nodes:
+            # Кольори вершин замість плоского кольору; динамічні джерела вимкнено
+            node.setColorOff(1)
+            node.setLightOff(1)
+
+        print(f"[LIGHT] Запечено {len(entries)} geom ({source}) за "
+              f"{(time.perf_counter() - start) * 1000:.1f} мс")
+
+# ============================================
+# AUDIO (кеш ефектів, пул голосів, потокова музика)
+# ============================================
+SOUND_EFFECTS = {
+    "trigger": "sounds/trigger",
+    "grip": "sounds/grip",
+    "menu": "sounds/menu",
+}
+MUSIC_TRACK = "sounds/music"
+SOUND_EXTENSIONS = (".ogg", ".wav", ".mp3", ".flac")
+
+def find_sound_file(path):
+    for extension in SOUND_EXTENSIONS:
+        if os.path.exists(path + extension):
+            return path + extension
+    return None
+
+class AudioSystem:
+    """Ефекти з пам'яті через фіксований пул голосів (з витісненням за пріоритетом) та потокова музика"""
+
+    def __init__(self, base, config, effects=SOUND_EFFECTS, voices=8, copies=2, cull_distance=30.0):
+        self.base = base
+        self.effects = effects
+        self.enabled = config.get("sound_enabled", True)
+        self.effects_volume = config.get("effects_volume", 0.8)
+        self.music_volume = config.get("music_volume", 0.7)
+        self.copies = copies  # одночасних програвань одного ефекту
+        self.cull_distance = cull_distance
+        self.sfx_manager = base.sfxManagerList[0] if base.sfxManagerList else None
+        self.music_manager = base.musicManager
+
+        self.cache = {}  # ім'я -> [AudioSound]
+        self.next_copy = {}
+        self.voices = [None] * voices  # (AudioSound, пріоритет, час старту)
+        self.music = None
+
+        self.load_times = {}
+        self.trigger_times = []
+        self.culled = 0
+        self.dropped = 0
+        self.stolen = 0
+
+    def preload(self):
+        """Завантаження коротких ефектів у пам'ять (декодування один раз, не на вводі)"""
+        if not self.enabled or self.sfx_manager is None:
+            return
+        for name, path in self.effects.items():
+            filename = find_sound_file(path)
+            if filename is None:
+                continue
+            start = time.perf_counter()
+            sounds = [self.sfx_manager.getSound(Filename.fromOsSpecific(filename), False,
+                                                AudioManager.SM_sample)
+                      for _ in range(self.copies)]
+            self.load_times[name] = time.perf_counter() - start
+            self.cache[name] = sounds
+            self.next_copy[name] = 0
+        print(f"[AUDIO] Завантажено ефектів: {len(self.cache)}")
+
+    def play_music(self, path=MUSIC_TRACK):
+        """Музика читається потоково, без повного завантаження в пам'ять"""
+        filename = find_sound_file(path)
+        if not self.enabled or filename is None or self.music_manager is None:
+            return
+        self.music = self.music_manager.getSound(Filename.fromOsSpecific(filename), False,
+                                                 AudioManager.SM_stream)
+        self.music.setLoop(True)
+        self.music.setVolume(self.music_volume)
+        self.music.play()
+
+    def listener_pos(self):
+        """Позиція слухача: HMD у VR, інакше камера"""
+        vr_manager = getattr(self.base, 'vr_manager', None)
+        if vr_manager and vr_manager.vr_initialized:
+            return vr_manager.head.getPos(render)
+        return self.base.camera.getPos(render)
+
+    def find_voice(self, priority, busy_sounds=None):
+        """Вільний голос або найменш важливий (і найстаріший) з не вищим пріоритетом.
+        busy_sounds - коли всі копії ефекту грають: вибір лише серед голосів, що їх тримають"""
+        candidate = None
+        for index, voice in enumerate(self.voices):
+            if busy_sounds is not None:
+                if voice is None or voice[0] not in busy_sounds:
+                    continue
+            elif voice is None or voice[0].status() != AudioSound.PLAYING:
+                return index
+            if voice[1] <= priority and (candidate is None or
+                                         (voice[1], voice[2]) < (self.voices[candidate][1],
+                                                                 self.voices[candidate][2])):
+                candidate = index
+        return candidate
+
+    def play(self, name, priority=0, pos=None):
+        """Програвання ефекту; повертає AudioSound або None (вимкнено, відсічено, немає голосу)"""
+        start = time.perf_counter()
+        sounds = self.cache.get(name)
+        if not self.enabled or not sounds:
+            return None
+
+        volume = self.effects_volume
+        if pos is not None:
+            distance = (pos - self.listener_pos()).length()
+            if distance > self.cull_distance:
+                self.culled += 1
+                return None
+            volume *= 1.0 - distance / self.cull_distance
+
+        # Вільна копія (по колу); якщо всі грають - одну з них можна лише витіснити за пріоритетом
+        sound = None
+        for step in range(len(sounds)):
+            copy = sounds[(self.next_copy[name] + step) % len(sounds)]
+            if copy.status() != AudioSound.PLAYING:
+                sound = copy
+                self.next_copy[name] = (self.next_copy[name] + step + 1) % len(sounds)
+                break
+
+        if sound is None:
+            index = self.find_voice(priority, busy_sounds=sounds)
+            if index is not None:
+                sound = self.voices[index][0]
+        else:
+            index = self.find_voice(priority)
+        if index is None:
+            self.dropped += 1
+            return None
+
+        voice = self.voices[index]
+        if voice is not None and voice[0].status() == AudioSound.PLAYING:
+            voice[0].stop()
+            self.stolen += 1
+        # Голос, що тримав цю копію раніше (вона вже дограла), звільняється
+        for other, other_voice in enumerate(self.voices):
+            if other != index and other_voice is not None and other_voice[0] is sound:
+                self.voices[other] = None
+
+        sound.setVolume(volume)
+        sound.play()
+        self.voices[index] = (sound, priority, start)
+        self.trigger_times.append(time.perf_counter() - start)
+        return sound
+
+    def report(self):
+        """Затримки завантаження та запуску ефектів"""
+        for name, seconds in self.load_times.items():
+            print(f"[AUDIO] Завантаження {name}: {seconds * 1000:.2f} мс")
+        if self.trigger_times:
+            times = sorted(self.trigger_times)
+            average = sum(times) / len(times)
+            p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+            print(f"[AUDIO] Запусків: {len(times)}, середня затримка {average * 1e6:.1f} мкс, "
+                  f"p99 {p99 * 1e6:.1f} мкс")
+        print(f"[AUDIO] Відсічено за відстанню: {self.culled}, витіснено: {self.stolen}, "
+              f"без голосу: {self.dropped}")
+
+def benchmark_audio(triggers=2000):
+    """Бенчмарк аудіо на згенерованих ефектах (з --headless - через null-менеджер)"""
+    import wave
+
+    loadPrcFileData("", "window-type none")
+    base = ShowBase()
+    base.camera = render.attachNewNode("BenchListener")
+    rng = random.Random(3)
+
+    with tempfile.TemporaryDirectory() as sound_dir:
+        effects = {}
+        for name in SOUND_EFFECTS:
+            path = os.path.join(sound_dir, name)
+            with wave.open(path + ".wav", "wb") as sample:
+                sample.setnchannels(1)
+                sample.setsampwidth(2)
+                sample.setframerate(22050)
+                sample.writeframes(b"".join(struct.pack("<h", int(8000 * math.sin(i * 0.05)))
+                                            for i in range(4410)))
+            effects[name] = path
+
+        audio = AudioSystem(base, default_itconfig(), effects=effects)
+        audio.preload()
+        for i in range(triggers):
+            pos = Point3(rng.uniform(-40, 40), rng.uniform(-40, 40), 0)
+            audio.play(rng.choice(list(effects)), priority=rng.randint(0, 3), pos=pos)
+            if i % 16 == 0 and audio.sfx_manager:
+                audio.sfx_manager.update()
+
+    print(f"[BENCH] Менеджер звуку: {type(audio.sfx_manager).__name__}")
+    audio.report()
+    base.destroy()
+
+# ============================================
+# REPLICATION (спільні сесії через UDP)
+# ============================================
+NET_PORT = 47777
+NET_TICK_RATE = 20  # снапшотів на секунду
+NET_MAX_PAYLOAD = 1200  # байт на пакет (без фрагментації IP)
+NET_CLIENT_TIMEOUT = 5.0
+
+PKT_SNAPSHOT = 1  # сервер -> клієнт
+PKT_INPUT = 2  # клієнт -> сервер: ack + власні пози
+SNAPSHOT_HEADER = struct.Struct("<BIIdHH")  # тип, seq, baseline, час сервера, оновлення, видалення
+INPUT_HEADER = struct.Struct("<BIB")  # тип, останній отриманий seq, кількість поз
+
+POS_QUANT = 100  # 1 см
+ANGLE_QUANT = 65536 / 360.0  # u16 на повний оберт
+MASK_NEW = 0x80  # сутність відсутня в baseline - усі поля відносно нуля
+
+# Ідентифікатори: об'єкти світу < PLAYER_ID_BASE, частини гравців - вище
+PLAYER_ID_BASE = 0x10000
+PLAYER_PARTS = ["avatar", "origin", "head", "left_hand", "right_hand"]
+
+def player_entity_id(player_index, part):
+    return PLAYER_ID_BASE + player_index * len(PLAYER_PARTS) + part
+
+def quantize_pose(pos, hpr):
+    return (round(pos[0] * POS_QUANT), round(pos[1] * POS_QUANT), round(pos[2] * POS_QUANT),
+            round(hpr[0] * ANGLE_QUANT) & 0xFFFF, round(hpr[1] * ANGLE_QUANT) & 0xFFFF,
+            round(hpr[2] * ANGLE_QUANT) & 0xFFFF)
+
+def dequantize_pose(state):
+    return (Point3(state[0] / POS_QUANT, state[1] / POS_QUANT, state[2] / POS_QUANT),
+            Vec3(state[3] / ANGLE_QUANT, state[4] / ANGLE_QUANT, state[5] / ANGLE_QUANT))
+
+def write_varint(buf, value):
+    """Беззнаковий varint (LEB128)"""
+    while value >= 0x80:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+def read_varint(data, offset):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+def zigzag(value):
+    return value << 1 if value >= 0 else ((-value) << 1) - 1
+
+def unzigzag(value):
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+def field_delta(index, new, old):
+    """Різниця поля; кути - найкоротшим шляхом по колу u16"""
+    if index >= 3:
+        return ((new - old + 0x8000) & 0xFFFF) - 0x8000
+    return new - old
+
+def field_apply(index, old, delta):
+    if index >= 3:
+        return (old + delta) & 0xFFFF
+    return old + delta
+
+def encode_entity(buf, entity_id, state, base):
+    write_varint(buf, entity_id)
+    if base is None:
+        buf.append(MASK_NEW | 0x3F)
+        for value in state:
+            write_varint(buf, zigzag(value))
+        return
+    mask = 0
+    for i in range(6):
+        if state[i] != base[i]:
+            mask |= 1 << i
+    buf.append(mask)
+    for i in range(6):
+        if mask & (1 << i):
+            write_varint(buf, zigzag(field_delta(i, state[i], base[i])))
+
+def encode_snapshot(seq, baseline_seq, server_time, state, baseline, max_payload=NET_MAX_PAYLOAD,
+                    last_sent=None):
+    """Дельта-снапшот відносно підтвердженого baseline.
+    last_sent (id -> seq останнього надсилання) задає чергу: при переповненні першими йдуть
+    сутності, які найдовше не надсилались, і оновлюється на місці.
+    Повертає (пакет, стан, який відновить клієнт)."""
+    budget = max_payload - SNAPSHOT_HEADER.size
+    sent = dict(baseline)
+
+    # Видалення дешеві й потрібні для коректної зони інтересу - вони йдуть першими в бюджеті
+    removals = bytearray()
+    removed_count = 0
+    for entity_id in baseline:
+        if entity_id in state:
+            continue
+        mark = len(removals)
+        write_varint(removals, entity_id)
+        if len(removals) > budget:
+            del removals[mark:]
+            break
+        del sent[entity_id]
+        removed_count += 1
+    budget -= len(removals)
+
+    changed = [entity_id for entity_id, values in state.items() if baseline.get(entity_id) != values]
+    if last_sent is not None:
+        changed.sort(key=lambda entity_id: last_sent.get(entity_id, -1))
+
+    body = bytearray()
+    updates = 0
+    for entity_id in changed:
+        values = state[entity_id]
+        mark = len(body)
+        encode_entity(body, entity_id, values, baseline.get(entity_id))
+        if len(body) > budget:
+            # Не вмістилось: клієнт залишиться зі старим значенням, менші оновлення ще можуть влізти
+            del body[mark:]
+            continue
+        sent[entity_id] = values
+        updates += 1
+        if last_sent is not None:
+            last_sent[entity_id] = seq
+
+    header = SNAPSHOT_HEADER.pack(PKT_SNAPSHOT, seq, baseline_seq, server_time, updates, removed_count)
+    return header + body + removals, sent
+
+def decode_snapshot(packet, baseline):
+    """Відновлення повного стану з дельта-снапшоту"""
+    _, seq, baseline_seq, server_time, updates, removed = SNAPSHOT_HEADER.unpack_from(packet)
+    state = dict(baseline)
+    offset = SNAPSHOT_HEADER.size
+    for _ in range(updates):
+        entity_id, offset = read_varint(packet, offset)
+        mask = packet[offset]
+        offset += 1
+        base = None if mask & MASK_NEW else state[entity_id]
+        values = []
+        for i in range(6):
+            if mask & (1 << i):
+                delta, offset = read_varint(packet, offset)
+                delta = unzigzag(delta)
+                values.append(delta if base is None else field_apply(i, base[i], delta))
+            else:
+                values.append(base[i])
+        state[entity_id] = tuple(values)
+    for _ in range(removed):
+        entity_id, offset = read_varint(packet, offset)
+        state.pop(entity_id, None)
+    return seq, server_time, state
+
+def encode_input(ack_seq, poses):
+    """Пакет клієнта: підтвердження снапшоту та власні пози {part: стан}"""
+    buf = bytearray(INPUT_HEADER.pack(PKT_INPUT, ack_seq, len(poses)))
+    for part, state in poses.items():
+        buf.append(part)
+        for value in state:
+            write_varint(buf, zigzag(value))
+    return bytes(buf)
+
+def decode_input(packet):
+    _, ack_seq, count = INPUT_HEADER.unpack_from(packet)
+    offset = INPUT_HEADER.size
+    poses = {}
+    for _ in range(count):
+        part = packet[offset]
+        offset += 1
+        values = []
+        for _ in range(6):
+            value, offset = read_varint(packet, offset)
+            values.append(unzigzag(value))
+        poses[part] = tuple(values)
+    return ack_seq, poses
+
+class ReplicationPeer:
+    """Стан одного клієнта на сервері"""
+
+    def __init__(self, address, index):
+        self.address = address
+        self.index = index
+        self.acked = 0
+        self.history = {}  # seq -> стан, який має клієнт після цього снапшоту
+        self.last_sent = {}  # id -> seq, коли сутність востаннє потрапила в снапшот
+        self.position = None
+        self.last_seen = time.monotonic()
+
+class ReplicationServer:
+    """Авторитетний сервер: дельта-снапшоти з урахуванням зони інтересу кожного клієнта"""
+
+    def __init__(self, host="127.0.0.1", port=NET_PORT, interest_radius=60.0, history=32):
+        import socket
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host, port))
+        self.socket.setblocking(False)
+        self.port = self.socket.getsockname()[1]
+        self.interest_radius = interest_radius * POS_QUANT
+        self.history = history
+        self.entities = {}  # id -> квантований стан
+        self.peers = {}
+        self.next_index = 1  # 0 - гравець на хості
+        self.seq = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def set_entity(self, entity_id, pos, hpr):
+        self.entities[entity_id] = quantize_pose(pos, hpr)
+
+    def remove_entity(self, entity_id):
+        self.entities.pop(entity_id, None)
+
+    def poll(self):
+        """Прийом пакетів клієнтів (ack + пози)"""
+        while True:
+            try:
+                packet, address = self.socket.recvfrom(2048)
+            except (BlockingIOError, ConnectionResetError):
+                break
+            self.bytes_received += len(packet)
+            if not packet or packet[0] != PKT_INPUT:
+                continue
+
+            peer = self.peers.get(address)
+            if peer is None:
+                peer = ReplicationPeer(address, self.next_index)
+                self.next_index += 1
+                self.peers[address] = peer
+                print(f"[NET] Клієнт {address[0]}:{address[1]} підключився як гравець {peer.index}")
+
+            ack_seq, poses = decode_input(packet)
+            peer.last_seen = time.monotonic()
+            if ack_seq > peer.acked and ack_seq in peer.history:
+                peer.acked = ack_seq
+            for part, state in poses.items():
+                self.entities[player_entity_id(peer.index, part)] = state
+            anchor = poses.get(PLAYER_PARTS.index("head"), poses.get(PLAYER_PARTS.index("avatar")))
+            if anchor:
+                peer.position = anchor
+
+        # Відключення клієнтів, що мовчать
+        now = time.monotonic()
+        for address, peer in list(self.peers.items()):
+            if now - peer.last_seen > NET_CLIENT_TIMEOUT:
+                print(f"[NET] Гравець {peer.index} відключився")
+                for part in range(len(PLAYER_PARTS)):
+                    self.remove_entity(player_entity_id(peer.index, part))
+                del self.peers[address]
+
+    def interest_state(self, peer):
+        """Сутності в радіусі інтересу клієнта, крім його власних"""
+        own_first = player_entity_id(peer.index, 0)
+        own_last = own_first + len(PLAYER_PARTS)
+        if peer.position is None:
+            return {entity_id: state for entity_id, state in self.entities.items()
+                    if not own_first <= entity_id < own_last}
+        px, py = peer.position[0], peer.position[1]
+        radius_sq = self.interest_radius * self.interest_radius
+        visible = {}
+        for entity_id, state in self.entities.items():
+            if own_first <= entity_id < own_last:
+                continue
+            dx = state[0] - px
+            dy = state[1] - py
+            if dx * dx + dy * dy <= radius_sq:
+                visible[entity_id] = state
+        return visible
+
+    def send_snapshots(self, server_time):
+        self.seq += 1
+        for peer in self.peers.values():
+            baseline = peer.history.get(peer.acked) if peer.acked else None
+            baseline_seq = peer.acked if baseline is not None else 0
+            packet, sent = encode_snapshot(self.seq, baseline_seq, server_time,
+                                           self.interest_state(peer), baseline or {},
+                                           last_sent=peer.last_sent)
+            peer.history[self.seq] = sent
+            # Історія: лише снапшоти, новіші за підтверджений
+            for seq in [seq for seq in peer.history if seq < peer.acked or seq <= self.seq - self.history]:
+                del peer.history[seq]
+            try:
+                self.bytes_sent += self.socket.sendto(packet, peer.address)
+            except OSError:
+                pass
+
+    def close(self):
+        self.socket.close()
+
+class ReplicationClient:
+    """Клієнт: відновлює стан з дельт, підтверджує снапшоти та інтерполює віддалені сутності"""
+
+    def __init__(self, host="127.0.0.1", port=NET_PORT, interp_delay=2.0 / NET_TICK_RATE, history=64):
+        import socket
+        self.address = (host, port)
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+        self.interp_delay = interp_delay
+        self.history = history
+        self.snapshots = {}  # seq -> повний стан (baseline для наступних дельт)
+        self.latest_seq = 0
+        self.timeline = []  # [(час сервера, стан)] для інтерполяції
+        self.clock_offset = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def poll(self):
+        """Прийом снапшотів; повертає True, якщо був новий"""
+        received = False
+        while True:
+            try:
+                packet = self.socket.recv(65536)
+            except (BlockingIOError, ConnectionRefusedError, ConnectionResetError):
+                break
+            self.bytes_received += len(packet)
+            if not packet or packet[0] != PKT_SNAPSHOT:
+                continue
+
+            baseline_seq = SNAPSHOT_HEADER.unpack_from(packet)[2]
+            baseline = self.snapshots.get(baseline_seq, {} if baseline_seq == 0 else None)
+            if baseline is None:
+                continue  # baseline вже забутий - чекаємо на наступний
+
+            seq, server_time, state = decode_snapshot(packet, baseline)
+            if seq <= self.latest_seq:
+                continue  # застарілий пакет
+            self.latest_seq = seq
+            self.snapshots[seq] = state
+            for old_seq in [old for old in self.snapshots if old <= seq - self.history]:
+                del self.snapshots[old_seq]
+
+            offset = server_time - time.monotonic()
+            self.clock_offset = offset if self.clock_offset is None else max(self.clock_offset, offset)
+            self.timeline.append((server_time, state))
+            received = True
+        return received
+
+    def send_input(self, poses):
+        """Надсилання ack і власних поз {part: (pos, hpr)}"""
+        packet = encode_input(self.latest_seq, {part: quantize_pose(pos, hpr)
+                                                 for part, (pos, hpr) in poses.items()})
+        try:
+            self.bytes_sent += self.socket.sendto(packet, self.address)
+        except OSError:
+            pass
+
+    def sample(self):
+        """Інтерпольований стан {id: (pos, hpr)} із затримкою interp_delay"""
+        if not self.timeline:
+            return {}
+        render_time = time.monotonic() + self.clock_offset - self.interp_delay
+
+        # Залишаємо один кадр до render_time як ліву точку інтерполяції
+        while len(self.timeline) > 2 and self.timeline[1][0] <= render_time:
+            self.timeline.pop(0)
+
+        older_time, older = self.timeline[0]
+        if len(self.timeline) == 1 or render_time <= older_time:
+            return {entity_id: dequantize_pose(state) for entity_id, state in older.items()}
+
+        newer_time, newer = self.timeline[1]
+        t = min(1.0, (render_time - older_time) / max(newer_time - older_time, 1e-6))
+        result = {}
+        for entity_id, state in newer.items():
+            start = older.get(entity_id)
+            if start is None:
+                result[entity_id] = dequantize_pose(state)
+                continue
+            blended = [start[i] + field_delta(i, state[i], start[i]) * t for i in range(6)]
+            result[entity_id] = dequantize_pose(blended)
+        return result
+
+    def close(self):
+        self.socket.close()
+
+class ReplicationSession:
+    """Прив'язка реплікації до гри: хост або клієнт"""
+
+    def __init__(self, base, host_port=None, connect=None):
+        self.base = base
+        self.server = None
+        self.client = None
+        self.remote_ids = {}  # id в мережі -> id в EntityStore
+        self.applied = {}  # id в мережі -> остання записана поза (pos, hpr)
+        self.next_send = 0.0
+
+        if host_port is not None:
+            self.server = ReplicationServer(host="0.0.0.0", port=host_port)
+            print(f"[NET] Сервер слухає порт {self.server.port}")
+        else:
+            host, _, port = connect.partition(":")
+            self.client = ReplicationClient(host or "127.0.0.1", int(port or NET_PORT))
+            print(f"[NET] Підключення до {host}:{port or NET_PORT}")
+
+    def local_poses(self):
+        """Пози локального гравця у світових координатах"""
+        vr_manager = self.base.vr_manager
+        nodes = {
+            PLAYER_PARTS.index("origin"): vr_manager.vr_origin,
+            PLAYER_PARTS.index("head"): vr_manager.head,
+            PLAYER_PARTS.index("left_hand"): vr_manager.left_hand,
+            PLAYER_PARTS.index("right_hand"): vr_manager.right_hand,
+        }
+        if hasattr(self.base, 'avatar'):
+            nodes[PLAYER_PARTS.index("avatar")] = self.base.avatar
+        return {part: (node.getPos(render), node.getHpr(render)) for part, node in nodes.items()}
+
+    def update(self, task):
+        now = time.monotonic()
+        send = now >= self.next_send
+        if send:
+            self.next_send = now + 1.0 / NET_TICK_RATE
+
+        if self.server:
+            self.server.poll()
+            if send:
+                entities = self.base.entities
+                for index, prop_id in enumerate(self.base.prop_ids):
+                    self.server.set_entity(index, entities.get_pos(prop_id), entities.get_hpr(prop_id))
+                for part, (pos, hpr) in self.local_poses().items():
+                    self.server.set_entity(player_entity_id(0, part), pos, hpr)
+                self.server.send_snapshots(now)
+            self.apply_remote({entity_id: dequantize_pose(state)
+                               for entity_id, state in self.server.entities.items()
+                               if entity_id >= player_entity_id(1, 0)})
+        else:
+            self.client.poll()
+            if send:
+                self.client.send_input(self.local_poses())
+            self.apply_remote(self.client.sample())
+        return task.cont
+
+    def apply_remote(self, poses):
+        """Віддалені сутності оновлюються через EntityStore; лише ті, чия поза змінилась"""
+        entities = self.base.entities
+        applied = self.applied
+        for network_id, (pos, hpr) in poses.items():
+            # Незмінна поза не позначає сутність брудною: інакше sync штовхає всі об'єкти
+            # щокадру, а LOD-спостерігач скидає імпостори
+            previous = applied.get(network_id)
+            if previous is not None and previous[0] == pos and previous[1] == hpr:
+                continue
+            if network_id < PLAYER_ID_BASE:
+                if network_id >= len(self.base.prop_ids):
+                    continue
+                entity_id = self.base.prop_ids[network_id]
+            else:
+                entity_id = self.remote_ids.get(network_id)
+                if entity_id is None:
+                    entity_id = self.create_remote_part(network_id)
+            entities.set_pos(entity_id, *pos)
+            entities.set_hpr(entity_id, *hpr)
+            applied[network_id] = (pos, hpr)
+
+        # Гравці, що зникли зі снапшоту (вийшли або поза зоною інтересу)
+        for network_id in [nid for nid in self.remote_ids if nid not in poses]:
+            entities.destroy(self.remote_ids.pop(network_id))
+            applied.pop(network_id, None)
+
+    def create_remote_part(self, network_id):
+        part = PLAYER_PARTS[(network_id - PLAYER_ID_BASE) % len(PLAYER_PARTS)]
+        node = loader.loadModel(baked("models/box"))
+        node.reparentTo(render)
+        scale = {"head": (0.25, 0.25, 0.25), "avatar": (0.5, 0.5, 1.7)}.get(part, (0.1, 0.1, 0.1))
+        entity_id = self.base.entities.create(scale=scale, color=(0.9, 0.5, 0.8, 1))
+        self.base.entities.bind(entity_id, node)
+        self.remote_ids[network_id] = entity_id
+        return entity_id
+
+    def close(self):
+        if self.server:
+            self.server.close()
+        if self.client:
+            self.client.close()
+
+def run_replication_bench_server(conn, clients, props, ticks):
+    """Серверний процес бенчмарку: рухомі об'єкти + снапшоти з фіксованою частотою"""
+    server = ReplicationServer(port=0)
+    conn.send(server.port)
+    rng = random.Random(1)
+    positions = [[rng.uniform(-100, 100), rng.uniform(-100, 100), 0] for _ in range(props)]
+    for entity_id, pos in enumerate(positions):
+        server.set_entity(entity_id, pos, (0, 0, 0))
+
+    # Чекаємо, доки підключаться всі клієнти
+    deadline = time.monotonic() + 10
+    while len(server.peers) < clients and time.monotonic() < deadline:
+        server.poll()
+        time.sleep(0.01)
+
+    cpu_start = time.process_time()
+    bytes_start = server.bytes_sent
+    next_tick = time.monotonic()
+    for tick in range(ticks):
+        server.poll()
+        # 10% об'єктів рухаються щотику
+        for entity_id in rng.sample(range(props), props // 10):
+            pos = positions[entity_id]
+            pos[0] += rng.uniform(-0.2, 0.2)
+            pos[1] += rng.uniform(-0.2, 0.2)
+            server.set_entity(entity_id, pos, (tick % 360, 0, 0))
+        server.send_snapshots(time.monotonic())
+        next_tick += 1.0 / NET_TICK_RATE
+        time.sleep(max(0.0, next_tick - time.monotonic()))
+
+    full_state = len(encode_snapshot(0, 0, 0.0, server.entities, {}, max_payload=1 << 30)[0])
+    conn.send({
+        "cpu": time.process_time() - cpu_start,
+        "bytes_sent": server.bytes_sent - bytes_start,
+        "bytes_received": server.bytes_received,
+        "full_state": full_state,
+        "peers": len(server.peers),
+    })
+    server.close()
+
+def benchmark_replication(clients=32, props=500, ticks=200):
+    """Бенчмарк трафіку та CPU: N клієнтів проти локального серверного процесу"""
+    import multiprocessing
+    parent_conn, child_conn = multiprocessing.Pipe()
+    server_process = multiprocessing.Process(target=run_replication_bench_server,
+                                             args=(child_conn, clients, props, ticks))
+    server_process.start()
+    port = parent_conn.recv()
+
+    rng = random.Random(2)
+    sessions = []
+    for _ in range(clients):
+        client = ReplicationClient(port=port)
+        position = [rng.uniform(-100, 100), rng.uniform(-100, 100), 1.7]
+        sessions.append((client, position))
+
+    cpu_start = time.process_time()
+    while not parent_conn.poll():
+        for client, position in sessions:
+            client.poll()
+            position[0] += rng.uniform(-0.1, 0.1)
+            position[1] += rng.uniform(-0.1, 0.1)
+            client.send_input({part: (position, (0, 0, 0)) for part in range(len(PLAYER_PARTS))})
+            client.sample()
+        time.sleep(1.0 / NET_TICK_RATE / 2)
+    client_cpu = time.process_time() - cpu_start
+
+    stats = parent_conn.recv()
+    server_process.join()
+    for client, _ in sessions:
+        client.close()
+
+    seconds = ticks / NET_TICK_RATE
+    per_client_down = stats["bytes_sent"] / clients / seconds
+    print(f"[BENCH] {clients} клієнтів, {props} об'єктів, {ticks} тиків по {NET_TICK_RATE} Гц")
+    print(f"[BENCH] Підключено до сервера: {stats['peers']}")
+    print(f"[BENCH] Повний стан: {stats['full_state']} байт/снапшот на клієнта без дельт і зони інтересу")
+    print(f"[BENCH] Сервер -> клієнт: {per_client_down / 1024:.1f} КіБ/с "
+          f"({stats['bytes_sent'] / clients / ticks:.0f} байт/снапшот)")
+    print(f"[BENCH] Клієнт -> сервер: {stats['bytes_received'] / clients / seconds / 1024:.2f} КіБ/с")
+    print(f"[BENCH] CPU сервера: {stats['cpu'] / ticks * 1000:.2f} мс/тик")
+    print(f"[BENCH] CPU клієнтів (усі {clients}, в одному процесі): {client_cpu / ticks * 1000:.2f} мс/тик")
+
 # ============================================
 # MAIN MENU (VR Ready)
 # ============================================
@@ -487,7 +2533,7 @@ class MainMenu:
         # Заголовок
         title_text = TextNode('title')
         title_text.setText("☆ SAO VR Simulator ☆")
-        title_text.setFont(loader.loadFont("cmss12"))
+        title_text.setFont(loader.loadFont(baked("cmss12")))
         title_node = self.menu_root.attachNewNode(title_text)
         title_node.setScale(0.5)
         title_node.setPos(-4, 0, 2)
@@ -503,7 +2549,7 @@ class MainMenu:
             btn_root.setPos(pos[0], pos[1], pos[2])
             
             # Фон кнопки
-            bg = loader.loadModel("models/box")
+            bg = loader.loadModel(baked("models/box"))
             bg.setScale(2, 0.2, 0.5)
             bg.setColor(0.2, 0.2, 0.5, 0.8)
             bg.reparentTo(btn_root)
@@ -511,7 +2557,7 @@ class MainMenu:
             # Текст
             btn_text = TextNode('button_text')
             btn_text.setText(label)
-            btn_text.setFont(loader.loadFont("cmss12"))
+            btn_text.setFont(loader.loadFont(baked("cmss12")))
             btn_node = btn_root.attachNewNode(btn_text)
             btn_node.setScale(0.3)
             btn_node.setPos(-0.8, 0.1, 0)
@@ -572,27 +2618,84 @@ class MainMenu:
 # VR SIMULATOR
 # ============================================
 class SimulatorVR(ShowBase):
-    def __init__(self):
+    def __init__(self, config=None, profile_startup=False, record_path=None, replay_path=None,
+                 headless=False, host_port=None, connect=None):
+        # Конфігурація читається один раз і спільна для всіх підсистем
+        config = config if config is not None else load_itconfig()
+        startup_profiler.mark("config")
+        self.profile_startup = profile_startup
+        self.record_path = record_path
+        self.replay_path = replay_path
+        self.headless = headless
+        self.host_port = host_port
+        self.connect = connect
+        self.network = None
+        
+        if headless:
+            # Без вікна та звуку: рендер у позаекранний буфер
+            loadPrcFileData("", "window-type offscreen\naudio-library-name null")
+        
+        # Запечені ассети мають бути на шляху моделей ще до першого завантаження
+        mount_asset_bundle()
+        startup_profiler.mark("asset bundle")
+        
         super().__init__()
         
         # Налаштування вікна
         props = WindowProperties()
         props.setTitle("SAO VR Simulator - MyUp Edition")
         props.setSize(1920, 1080)
-        self.win.requestProperties(props)
+        if isinstance(self.win, GraphicsWindow):
+            self.win.requestProperties(props)
+        startup_profiler.mark("ShowBase + window")
         
-        self.config = load_itconfig()
+        self.game_config = config
         self.world = render.attachNewNode("World")
+        self.entities = EntityStore()
         self.simulation_running = False
         
+        # Звук: ефекти завантажуються після першого кадру
+        self.audio = AudioSystem(self, config, voices=config.get("sfx_voices", 8),
+                                 cull_distance=config.get("sfx_cull_distance", 30.0))
+        
         # Створюємо VR менеджер
         self.vr_manager = VRSystemManager(self)
-        
-        # Створюємо директорії
-        self.create_directories()
+        startup_profiler.mark("VR")
         
         # Запускаємо завантаження
         LoadingScreen(self)
+        startup_profiler.mark("loading screen")
+        
+        # Час до першого кадру (після igLoop, sort=50)
+        self.taskMgr.add(self.on_first_frame, "first_frame", sort=60)
+    
+    def on_first_frame(self, task):
+        """Перший кадр показано: запускаємо некритичне налаштування"""
+        startup_profiler.mark("first frame")
+        elapsed = time.perf_counter() - STARTUP_TIME
+        print(f"[STARTUP] Перший кадр через {elapsed * 1000:.0f} мс")
+        
+        self.deferred_setup()
+        return task.done
+    
+    def deferred_setup(self):
+        """Робота з файловою системою, яка не потрібна для першого кадру"""
+        save_default_itconfig()
+        self.create_directories()
+        self.audio.preload()
+        startup_profiler.mark("deferred setup")
+        
+        if self.profile_startup:
+            startup_profiler.report()
+    
+    def finalizeExit(self):
+        # Дописуємо лог трекінгу перед виходом
+        self.vr_manager.stop_recording()
+        if self.network:
+            self.network.close()
+        if self.audio.trigger_times:
+            self.audio.report()
+        super().finalizeExit()
     
     def create_directories(self):
         dirs = ["sounds", "models", "saves", "screenshots", "shaders"]
@@ -614,10 +2717,18 @@ class SimulatorVR(ShowBase):
         
         # Створюємо світ
         self.create_world()
+        self.audio.play_music()
         
         # Запускаємо оновлення
         self.taskMgr.add(self.update, "update")
         self.taskMgr.add(self.vr_manager.update, "vr_update")
+        # Синхронізація сутностей з рендером перед малюванням кадру (igLoop має sort=50)
+        self.taskMgr.add(self.entities.sync_task, "entity_sync", sort=45)
+        
+        # Спільна сесія
+        if self.host_port is not None or self.connect:
+            self.network = ReplicationSession(self, host_port=self.host_port, connect=self.connect)
+            self.taskMgr.add(self.network.update, "replication", sort=40)
     
     def start_vr_mode(self):
         """Запуск у VR режимі"""
@@ -626,7 +2737,8 @@ class SimulatorVR(ShowBase):
         # Приховуємо курсор
         props = WindowProperties()
         props.setCursorHidden(True)
-        self.win.requestProperties(props)
+        if isinstance(self.win, GraphicsWindow):
+            self.win.requestProperties(props)
         
         # Інтро текст в VR
         self.create_vr_intro()
@@ -658,7 +2770,7 @@ class SimulatorVR(ShowBase):
         
         intro_text = TextNode('intro')
         intro_text.setText("Welcome to\nVirtual Reality\nSimulation Life")
-        intro_text.setFont(loader.loadFont("cmss12"))
+        intro_text.setFont(loader.loadFont(baked("cmss12")))
         intro_node = intro_root.attachNewNode(intro_text)
         intro_node.setScale(0.5)
         intro_node.setPos(-2, 0, 0)
@@ -667,48 +2779,72 @@ class SimulatorVR(ShowBase):
     
     def create_world(self):
         """Створення світу"""
+        static_flags = EntityStore.FLAG_VISIBLE | EntityStore.FLAG_STATIC
+
         # Підлога
-        floor = loader.loadModel("models/box")
-        floor.setScale(100, 100, 0.1)
-        floor.setPos(0, 0, -0.5)
-        floor.setColor(0.3, 0.3, 0.3, 1)
+        floor = loader.loadModel(baked("models/box"))
         floor.reparentTo(self.world)
+        self.floor_id = self.entities.create(pos=(0, 0, -0.5), scale=(100, 100, 0.1),
+                                             color=(0.3, 0.3, 0.3, 1), flags=static_flags)
+        self.entities.bind(self.floor_id, floor)
         
         # Сітка на підлозі для орієнтації в VR
         grid = self.create_grid()
         grid.reparentTo(self.world)
-        
+        static_nodes = [floor] + list(grid.getChildren())
+        
+        # Quadtree LOD для статичних об'єктів
+        self.lod = None
+        if self.game_config.get("lod_enabled", True):
+            self.lod = LODQuadtree(self, self.world,
+                                   pixel_error=self.game_config.get("lod_pixel_error", 2.0),
+                                   max_swaps=self.game_config.get("lod_max_swaps", 8))
+
         # Об'єкти
+        self.prop_ids = []
         for i in range(-5, 6, 2):
             for j in range(-5, 6, 2):
-                obj = loader.loadModel("models/box")
-                obj.setScale(0.5)
-                obj.setPos(i, j, 0)
-                obj.setColor(random.random(), random.random(), random.random(), 1)
-                obj.reparentTo(self.world)
-        
+                # Сутність керує вузлом Prop; рівні деталізації - його діти
+                prop = self.world.attachNewNode("Prop")
+                obj = loader.loadModel(baked("models/box"))
+                obj.reparentTo(prop)
+                entity_id = self.entities.create(
+                    pos=(i, j, 0), scale=(0.5, 0.5, 0.5),
+                    color=(random.random(), random.random(), random.random(), 1),
+                    flags=static_flags)
+                self.entities.bind(entity_id, prop)
+                self.prop_ids.append(entity_id)
+                static_nodes.append(prop)
+                if self.lod:
+                    proxy, proxy_error = build_cross_proxy(obj, self.world)
+                    item = self.lod.add([obj, proxy], [0.0, proxy_error], root=prop)
+                    self.entities.watch(entity_id, lambda item=item: self.lod.invalidate(item))
+
+        if self.lod:
+            self.lod.build()
+            self.taskMgr.add(self.lod.update, "lod_update")
+
         # Освітлення
         self.setup_lighting()
+        
+        # Статична геометрія: освітлення запікається один раз, динамічним лишаються руки й аватари
+        if self.game_config.get("baked_lighting", True):
+            LightingBaker(self.lights).bake(static_nodes)
     
     def create_grid(self):
         """Створення сітки для орієнтації"""
         grid_root = NodePath("Grid")
+        static_flags = EntityStore.FLAG_VISIBLE | EntityStore.FLAG_STATIC
         
-        # Лінії сітки
+        # Лінії сітки (вздовж Y та вздовж X)
         for i in range(-10, 11, 1):
-            line = loader.loadModel("models/box")
-            line.setScale(0.05, 20, 0.01)
-            line.setPos(i, 0, -0.4)
-            line.setColor(0.5, 0.5, 0.5, 0.3)
-            line.setTransparency(TransparencyAttrib.MAlpha)
-            line.reparentTo(grid_root)
-            
-            line2 = loader.loadModel("models/box")
-            line2.setScale(20, 0.05, 0.01)
-            line2.setPos(0, i, -0.4)
-            line2.setColor(0.5, 0.5, 0.5, 0.3)
-            line2.setTransparency(TransparencyAttrib.MAlpha)
-            line2.reparentTo(grid_root)
+            for pos, scale in (((i, 0, -0.4), (0.05, 20, 0.01)), ((0, i, -0.4), (20, 0.05, 0.01))):
+                line = loader.loadModel(baked("models/box"))
+                line.setTransparency(TransparencyAttrib.MAlpha)
+                line.reparentTo(grid_root)
+                line_id = self.entities.create(pos=pos, scale=scale, color=(0.5, 0.5, 0.5, 0.3),
+                                               flags=static_flags)
+                self.entities.bind(line_id, line)
         
         return grid_root
     
@@ -719,6 +2855,7 @@ class SimulatorVR(ShowBase):
         ambient_light.setColor(Vec4(0.3, 0.3, 0.3, 1))
         ambient_light_node = render.attachNewNode(ambient_light)
         render.setLight(ambient_light_node)
+        self.lights = [ambient_light_node]
         
         # Направлене світло
         directional_light = DirectionalLight('directional')
@@ -726,6 +2863,7 @@ class SimulatorVR(ShowBase):
         directional_light_node = render.attachNewNode(directional_light)
         directional_light_node.setHpr(45, -30, 0)
         render.setLight(directional_light_node)
+        self.lights.append(directional_light_node)
         
         # Точкове світло для аніме-ефектів
         point_light = PointLight('point')
@@ -733,6 +2871,7 @@ class SimulatorVR(ShowBase):
         point_light_node = render.attachNewNode(point_light)
         point_light_node.setPos(0, 0, 5)
         render.setLight(point_light_node)
+        self.lights.append(point_light_node)
     
     def move_vr(self, x, y):
         """Переміщення в VR"""
@@ -744,7 +2883,8 @@ class SimulatorVR(ShowBase):
         speed = 0.05
         
         move_vec = (direction * y * speed) + (direction * x * speed)
-        self.vr_manager.vr_origin.setPos(self.vr_manager.vr_origin.getPos() + move_vec)
+        origin_id = self.vr_manager.origin_id
+        self.entities.set_pos(origin_id, *(self.entities.get_pos(origin_id) + move_vec))
     
     def rotate_vr(self, x):
         """Поворот в VR"""
@@ -752,18 +2892,22 @@ class SimulatorVR(ShowBase):
             return
         
         # Snap turn
-        snap_amount = self.config.get("vr_snap_turn", 45)
+        snap_amount = self.game_config.get("vr_snap_turn", 45)
         if abs(x) > 0.7:
-            self.vr_manager.vr_origin.setH(self.vr_manager.vr_origin.getH() + snap_amount * x)
+            origin_id = self.vr_manager.origin_id
+            h, p, r = self.entities.get_hpr(origin_id)
+            self.entities.set_hpr(origin_id, h + snap_amount * x, p, r)
     
     def move_desktop(self, dx, dy, dz=0):
         """Переміщення в десктоп режимі"""
         if not hasattr(self, 'avatar'):
             self.avatar = render.attachNewNode("Avatar")
+            self.avatar_id = self.entities.create()
+            self.entities.bind(self.avatar_id, self.avatar)
         
         speed = 0.5
-        new_pos = self.avatar.getPos() + Vec3(dx * speed, dy * speed, dz * speed)
-        self.avatar.setPos(new_pos)
+        new_pos = self.entities.get_pos(self.avatar_id) + Vec3(dx * speed, dy * speed, dz * speed)
+        self.entities.set_pos(self.avatar_id, *new_pos)
     
     def remove_intro(self, task):
         if hasattr(self, 'intro'):
@@ -787,13 +2931,13 @@ class SimulatorVR(ShowBase):
         # Текст
         pause_text = TextNode('pause')
         pause_text.setText("PAUSED")
-        pause_text.setFont(loader.loadFont("cmss12"))
+        pause_text.setFont(loader.loadFont(baked("cmss12")))
         pause_node = pause_root.attachNewNode(pause_text)
         pause_node.setScale(0.3)
         pause_node.setPos(-1, 0, 1)
         
         # Кнопка Resume
-        resume_btn = loader.loadModel("models/box")
+        resume_btn = loader.loadModel(baked("models/box"))
         resume_btn.setScale(2, 0.2, 0.5)
         resume_btn.setColor(0.3, 0.6, 1, 0.8)
         resume_btn.setPos(0, 0, 0)
@@ -834,11 +2978,47 @@ if __name__ == "__main__":
     print("OPENXR VR READY")
     print("=" * 50)
     
-    # Перевірка OpenXR
-    if OPENXR_AVAILABLE:
-        print("[OK] OpenXR доступний")
-    else:
-        print("[WARN] OpenXR не доступний, робота в десктоп режимі")
+    parser = argparse.ArgumentParser(description="SAO VR Simulator - MyUp Edition")
+    parser.add_argument("--bake-assets", action="store_true",
+                        help=f"запекти ассети в {ASSET_BUNDLE} і вийти")
+    parser.add_argument("--bench-entities", type=int, nargs="?", const=100000, metavar="N",
+                        help="бенчмарк сховища сутностей (за замовчуванням 100k)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="звіт про час запуску за фазами")
+    parser.add_argument("--record", metavar="PATH",
+                        help="записати трекінг і ввід VR у бінарний лог")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="відтворити записаний лог без OpenXR")
+    parser.add_argument("--headless", action="store_true",
+                        help="без вікна та звуку (для бенчмарків і регресійних тестів)")
+    parser.add_argument("--host", type=int, nargs="?", const=NET_PORT, metavar="PORT",
+                        help=f"запустити спільну сесію (порт за замовчуванням {NET_PORT})")
+    parser.add_argument("--connect", metavar="HOST:PORT",
+                        help="підключитися до спільної сесії")
+    parser.add_argument("--bench-audio", type=int, nargs="?", const=2000, metavar="N",
+                        help="бенчмарк затримок звуку (з --headless - null-менеджер)")
+    parser.add_argument("--bench-replication", type=int, nargs="?", const=32, metavar="CLIENTS",
+                        help="бенчмарк реплікації з локальним серверним процесом (за замовчуванням 32)")
+    args = parser.parse_args()
+    
+    if args.bake_assets:
+        sys.exit(0 if bake_assets() else 1)
+    
+    if args.bench_entities:
+        benchmark_entity_store(args.bench_entities)
+        sys.exit(0)
+    
+    if args.bench_audio:
+        if args.headless:
+            loadPrcFileData("", "audio-library-name null")
+        benchmark_audio(args.bench_audio)
+        sys.exit(0)
+    
+    if args.bench_replication:
+        benchmark_replication(args.bench_replication)
+        sys.exit(0)
     
-    app = SimulatorVR()
+    app = SimulatorVR(profile_startup=args.profile_startup, record_path=args.record,
+                      replay_path=args.replay, headless=args.headless,
+                      host_port=args.host, connect=args.connect)
     app.run()
@@ -0,0 +1,109 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from panda3d.core import AudioSound, Point3, loadPrcFileData  # noqa: E402
+
+import beta  # noqa: E402
+
+
+class PlayingSound:
+    """Звук, що грає до stop() (null-менеджер завжди повертає READY)"""
+
+    def __init__(self):
+        self.playing = False
+        self.volume = None
+
+    def status(self):
+        return AudioSound.PLAYING if self.playing else AudioSound.READY
+
+    def play(self):
+        self.playing = True
+
+    def stop(self):
+        self.playing = False
+
+    def setVolume(self, volume):
+        self.volume = volume
+
+
+@pytest.fixture(scope="module")
+def base():
+    loadPrcFileData("", "window-type none\naudio-library-name null")
+    showbase = beta.ShowBase()
+    showbase.camera = showbase.render.attachNewNode("TestListener")
+    yield showbase
+    showbase.destroy()
+
+
+@pytest.fixture
+def effects(tmp_path):
+    import wave
+
+    paths = {}
+    for name in ("trigger", "menu"):
+        path = str(tmp_path / name)
+        with wave.open(path + ".wav", "wb") as sample:
+            sample.setnchannels(1)
+            sample.setsampwidth(2)
+            sample.setframerate(22050)
+            sample.writeframes(b"\0\0" * 2205)
+        paths[name] = path
+    return paths
+
+
+def test_null_manager_preload_play_and_report(base, effects, capsys):
+    assert base.sfxManagerList[0].getType().getName() == "NullAudioManager"
+    audio = beta.AudioSystem(base, beta.default_itconfig(), effects=effects, cull_distance=30.0)
+    audio.preload()
+    assert set(audio.cache) == {"trigger", "menu"}
+    assert set(audio.load_times) == {"trigger", "menu"}
+
+    assert audio.play("trigger", pos=Point3(3, 0, 0)) is not None
+    assert audio.play("menu") is not None
+    assert audio.play("missing") is None
+    assert audio.play("trigger", pos=Point3(100, 0, 0)) is None
+    assert audio.culled == 1
+    assert len(audio.trigger_times) == 2
+
+    audio.report()
+    assert "[AUDIO] Запусків: 2" in capsys.readouterr().out
+
+
+def test_stream_music_under_null_manager(base, effects):
+    audio = beta.AudioSystem(base, beta.default_itconfig(), effects=effects)
+    audio.play_music(effects["menu"])
+    assert audio.music is not None
+
+
+def test_busy_copy_is_not_restarted_over_higher_priority(base):
+    audio = beta.AudioSystem(base, beta.default_itconfig(), effects={}, voices=4, copies=1)
+    audio.cache = {"menu": [PlayingSound()]}
+    audio.next_copy = {"menu": 0}
+
+    first = audio.play("menu", priority=3)
+    assert first is not None
+    # Вільні голоси є, але єдина копія зайнята важливішим звуком
+    assert audio.play("menu", priority=0) is None
+    assert first.playing
+    assert audio.dropped == 1
+
+    assert audio.play("menu", priority=3) is first
+    assert audio.stolen == 1
+    assert sum(voice is not None for voice in audio.voices) == 1
+
+
+def test_voice_stealing_by_priority(base):
+    audio = beta.AudioSystem(base, beta.default_itconfig(), effects={}, voices=2, copies=1)
+    audio.cache = {name: [PlayingSound()] for name in ("a", "b", "c", "d")}
+    audio.next_copy = {name: 0 for name in audio.cache}
+
+    low = audio.play("a", priority=1)
+    high = audio.play("b", priority=3)
+    assert audio.play("c", priority=0) is None  # обидва голоси важливіші
+    assert audio.play("d", priority=2) is not None
+    assert not low.playing and high.playing
+    assert audio.stolen == 1 and audio.dropped == 1
@@ -0,0 +1,92 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from panda3d.core import NodePath  # noqa: E402
+
+import beta  # noqa: E402
+
+
+def bound_store(count):
+    store = beta.EntityStore()
+    root = NodePath("Root")
+    ids = []
+    for i in range(count):
+        entity_id = store.create(pos=(i, 0, 0))
+        store.bind(entity_id, root.attachNewNode(f"E{i}"))
+        ids.append(entity_id)
+    return store, ids
+
+
+def test_destroyed_slot_is_reused_with_new_generation():
+    store = beta.EntityStore()
+    first = store.create(pos=(1, 2, 3))
+    store.destroy(first)
+    second = store.create(pos=(4, 5, 6))
+
+    assert second & beta.EntityStore.SLOT_MASK == first & beta.EntityStore.SLOT_MASK
+    assert second != first
+    assert not store.is_alive(first)
+    assert store.is_alive(second)
+    assert store.get_pos(second) == (4, 5, 6)
+    assert len(store) == 1
+
+
+def test_stale_id_raises_key_error():
+    store = beta.EntityStore()
+    stale = store.create()
+    store.destroy(stale)
+    store.create()
+
+    with pytest.raises(KeyError):
+        store.get_pos(stale)
+    with pytest.raises(KeyError):
+        store.set_pos(stale, 0, 0, 0)
+    with pytest.raises(KeyError):
+        store.destroy(stale)
+
+
+def test_sync_pushes_only_dirty_entities():
+    store, ids = bound_store(36)
+    # bind() вже застосував стан
+    assert store.sync() == 0
+
+    for entity_id in ids:
+        store.set_pos(entity_id, 7, 8, 9)
+    assert store.sync() == 36
+    assert store.get_node(ids[5]).getPos() == (7, 8, 9)
+    assert store.sync() == 0
+
+    for entity_id in ids[:5]:
+        store.set_pos(entity_id, 1, 1, 1)
+        store.set_hpr(entity_id, 90, 0, 0)
+    assert store.sync() == 5
+
+
+def test_sync_skips_destroyed_entities():
+    store, ids = bound_store(4)
+    store.set_pos(ids[0], 1, 1, 1)
+    store.set_pos(ids[1], 1, 1, 1)
+    store.destroy(ids[1])
+    assert store.sync() == 1
+
+
+def test_watch_called_on_transform_sync_only():
+    store, ids = bound_store(2)
+    calls = []
+    store.watch(ids[0], lambda: calls.append(ids[0]))
+
+    store.set_color(ids[0], 1, 0, 0)
+    store.set_pos(ids[1], 3, 3, 3)
+    store.sync()
+    assert calls == []
+
+    store.set_pos(ids[0], 3, 3, 3)
+    store.sync()
+    assert calls == [ids[0]]
+
+    store.destroy(ids[0])
+    assert not store.watchers
@@ -0,0 +1,89 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from panda3d.core import AmbientLight, GeomVertexReader, Vec3, loadPrcFileData  # noqa: E402
+
+import beta  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def base():
+    loadPrcFileData("", "window-type none\naudio-library-name null")
+    showbase = beta.ShowBase()
+    yield showbase
+    showbase.destroy()
+
+
+def build_scene(base):
+    root = base.render.attachNewNode("LightingTest")
+    floor = base.loader.loadModel("models/box")
+    floor.reparentTo(root)
+    floor.setPos(-5, -5, -0.1)
+    floor.setScale(10, 10, 0.1)
+    prop = base.loader.loadModel("models/box")
+    prop.reparentTo(root)
+    prop.setPos(1, 1, 0)
+    prop.setScale(0.5)
+    ambient = root.attachNewNode(AmbientLight("Ambient"))
+    ambient.node().setColor((0.8, 0.8, 0.8, 1))
+    return root, floor, prop, ambient
+
+
+def top_colors(base, floor):
+    """(світова позиція, яскравість) вершин верхньої грані підлоги"""
+    result = []
+    for geom_np in floor.findAllMatches("**/+GeomNode"):
+        mat = geom_np.getMat(base.render)
+        for geom in geom_np.node().getGeoms():
+            vdata = geom.getVertexData()
+            vertex = GeomVertexReader(vdata, "vertex")
+            normal = GeomVertexReader(vdata, "normal")
+            color = GeomVertexReader(vdata, "color")
+            while not vertex.isAtEnd():
+                pos = mat.xformPoint(vertex.getData3())
+                brightness = color.getData4().x
+                if normal.getData3().z > 0.5:
+                    result.append((pos, brightness))
+    return result
+
+
+def bake_scene(base, cache_dir):
+    root, floor, prop, ambient = build_scene(base)
+    baker = beta.LightingBaker([ambient], cache_dir=str(cache_dir))
+    baker.bake([floor, prop])
+    colors = top_colors(base, floor)
+    root.removeNode()
+    return colors
+
+
+def test_floor_under_prop_is_darker_than_open_floor(base, tmp_path, capsys):
+    colors = bake_scene(base, tmp_path)
+    # Без поділу підлога мала б лише кутові вершини
+    assert len(colors) > 4
+
+    under = min(colors, key=lambda item: (item[0].getXy() - (1.25, 1.25)).length())
+    far = max(colors, key=lambda item: (item[0].getXy() - (1.25, 1.25)).length())
+    assert (under[0].getXy() - (1.25, 1.25)).length() < 0.5
+    assert under[1] < far[1] - 0.1
+    assert far[1] == pytest.approx(0.8, abs=0.01)
+    assert "(обчислено)" in capsys.readouterr().out
+
+    # Кеш відтворює і поділену геометрію, і світло
+    cached = bake_scene(base, tmp_path)
+    assert "(кеш)" in capsys.readouterr().out
+    assert [(tuple(pos), value) for pos, value in cached] == \
+        [(tuple(pos), value) for pos, value in colors]
+
+
+def test_near_focus_uses_cells_and_exact_spheres():
+    focus = [((0.0, 0.0, 0.0), 1.0)]
+    cells = beta.focus_cells(focus, 1.0)
+    assert beta.near_focus([Vec3(0.5, 0.5, 0), Vec3(2, 0, 0), Vec3(0, 2, 0)], focus, cells, 1.0)
+    assert not beta.near_focus([Vec3(5, 5, 0), Vec3(6, 5, 0), Vec3(5, 6, 0)], focus, cells, 1.0)
+    # Великий трикутник перевіряється напряму по сферах
+    assert beta.near_focus([Vec3(-50, -50, 0), Vec3(50, -50, 0), Vec3(0, 50, 0)], focus, cells, 1.0)
+    assert not beta.near_focus([Vec3(20, 20, 0), Vec3(60, 20, 0), Vec3(20, 60, 0)], focus, cells, 1.0)
@@ -0,0 +1,168 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import beta  # noqa: E402
+
+
+def pump(server, client, ticks=1, timeout=1.0):
+    """Один обмін на loopback: ack клієнта -> снапшот сервера -> прийом клієнтом"""
+    for _ in range(ticks):
+        client.send_input({beta.PLAYER_PARTS.index("head"): ((0, 0, 1.7), (0, 0, 0))})
+        deadline = time.monotonic() + timeout
+        while not server.peers and time.monotonic() < deadline:
+            server.poll()
+            time.sleep(0.001)
+        server.poll()
+        seq = server.seq + 1
+        server.send_snapshots(time.monotonic())
+        while client.latest_seq < seq and time.monotonic() < deadline:
+            client.poll()
+            time.sleep(0.001)
+
+
+def client_state(client):
+    return client.snapshots[client.latest_seq]
+
+
+def world_state(server):
+    """Стан сервера без частин самого клієнта (їх йому не надсилають)"""
+    return {entity_id: state for entity_id, state in server.entities.items()
+            if entity_id < beta.PLAYER_ID_BASE}
+
+
+def make_pair(**server_options):
+    server = beta.ReplicationServer(port=0, **server_options)
+    client = beta.ReplicationClient(port=server.port)
+    return server, client
+
+
+def test_delta_round_trip():
+    server, client = make_pair()
+    try:
+        for entity_id in range(20):
+            server.set_entity(entity_id, (entity_id, -entity_id, 0.5), (entity_id * 10, 0, 359))
+        pump(server, client)
+        assert client_state(client) == world_state(server)
+
+        server.set_entity(3, (3.25, -3, 0.5), (30, 5, 359))
+        pump(server, client)
+        assert client_state(client) == world_state(server)
+    finally:
+        server.close()
+        client.close()
+
+
+def test_acked_snapshot_becomes_baseline():
+    server, client = make_pair()
+    try:
+        for entity_id in range(50):
+            server.set_entity(entity_id, (entity_id, 0, 0), (0, 0, 0))
+        pump(server, client)
+        full_size = server.bytes_sent
+
+        # Клієнт підтверджує seq 1, тож наступний снапшот - дельта лише з однією зміною
+        server.set_entity(7, (7, 1, 0), (0, 0, 0))
+        pump(server, client)
+        peer = next(iter(server.peers.values()))
+        assert peer.acked == 1
+        assert server.bytes_sent - full_size < 40
+        assert client_state(client) == world_state(server)
+    finally:
+        server.close()
+        client.close()
+
+
+def test_interest_radius_removes_far_entities():
+    server, client = make_pair(interest_radius=10.0)
+    try:
+        server.set_entity(1, (5, 0, 0), (0, 0, 0))
+        server.set_entity(2, (50, 0, 0), (0, 0, 0))
+        pump(server, client, ticks=2)
+        assert 1 in client_state(client)
+        assert 2 not in client_state(client)
+
+        server.set_entity(1, (40, 0, 0), (0, 0, 0))
+        pump(server, client, ticks=2)
+        assert 1 not in client_state(client)
+    finally:
+        server.close()
+        client.close()
+
+
+def test_snapshot_fits_payload_including_header():
+    state = {entity_id: beta.quantize_pose((entity_id, entity_id, 0), (0, 0, 0))
+             for entity_id in range(500)}
+    packet, sent = beta.encode_snapshot(1, 0, 0.0, state, {})
+    assert len(packet) <= beta.NET_MAX_PAYLOAD
+    _, _, decoded = beta.decode_snapshot(packet, {})
+    assert decoded == sent
+    assert 0 < len(sent) < len(state)
+
+
+def test_truncated_snapshots_reach_every_entity():
+    # 2000 сутностей, перші 10% змінюються щотику: черга за давністю не дає голодувати хвосту
+    rng = random.Random(5)
+    state = {entity_id: beta.quantize_pose((rng.uniform(-50, 50), rng.uniform(-50, 50), 0), (0, 0, 0))
+             for entity_id in range(2000)}
+    last_sent = {}
+    client = {}
+    received = set()
+    for seq in range(1, 41):
+        for entity_id in range(200):
+            x, y, z, h, p, r = state[entity_id]
+            state[entity_id] = (x + 100, y, z, h, p, r)
+        packet, sent = beta.encode_snapshot(seq, seq - 1, 0.0, state, client, last_sent=last_sent)
+        assert len(packet) <= beta.NET_MAX_PAYLOAD
+        _, _, client = beta.decode_snapshot(packet, client)
+        assert client == sent
+        received.update(client)
+    assert received == set(state)
+
+
+def test_identical_snapshots_do_not_dirty_entities():
+    from types import SimpleNamespace
+    from panda3d.core import NodePath
+
+    entities = beta.EntityStore()
+    root = NodePath("World")
+    prop_ids = []
+    for index in range(36):
+        entity_id = entities.create()
+        entities.bind(entity_id, root.attachNewNode(f"Prop{index}"))
+        prop_ids.append(entity_id)
+    pushes = []
+    for entity_id in prop_ids:
+        entities.watch(entity_id, lambda entity_id=entity_id: pushes.append(entity_id))
+    base = SimpleNamespace(entities=entities, prop_ids=prop_ids)
+
+    server = beta.ReplicationServer(port=0)
+    session = beta.ReplicationSession(base, connect=f"127.0.0.1:{server.port}")
+    try:
+        for index in range(36):
+            server.set_entity(index, (index, 2, 0), (45, 0, 0))
+        pump(server, session.client)
+        session.apply_remote(session.client.sample())
+        assert entities.sync() == 36
+        pushes.clear()
+
+        # Сервер шле ті самі пози: жодна сутність не має стати брудною
+        for _ in range(5):
+            pump(server, session.client)
+            session.apply_remote(session.client.sample())
+            assert entities.sync() == 0
+        assert pushes == []
+
+        server.set_entity(4, (4, 3, 0), (45, 0, 0))
+        for _ in range(3):
+            pump(server, session.client)
+        time.sleep(session.client.interp_delay)
+        session.apply_remote(session.client.sample())
+        assert entities.sync() == 1
+        assert pushes == [prop_ids[4]]
+    finally:
+        server.close()
+        session.close()
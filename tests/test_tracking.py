@@ -0,0 +1,71 @@
+import os
+import struct
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import beta  # noqa: E402
+
+
+def frame_records(frame):
+    """Детерміновані записи кадру; значення точно представні у float32"""
+    records = [(beta.REC_POSE, beta.TRACK_HEAD, 0, (frame * 0.25, 1.5, 1.75, frame % 360, -10, 0))]
+    if frame % 3 == 0:
+        records.append((beta.REC_POSE, beta.TRACK_LEFT, 0, (-0.25, 0.5, 1.0, 0, 0, frame % 90)))
+    if frame % 7 == 0:
+        records.append((beta.REC_BUTTON, beta.TRACK_RIGHT, beta.INPUT_TRIGGER_PRESS, (0, 0, 0, 0, 0, 0)))
+    if frame % 5 == 0:
+        records.append((beta.REC_JOYSTICK, beta.TRACK_LEFT, 0, (0.5, -0.75, 0, 0, 0, 0)))
+    return records
+
+
+def test_log_round_trips_across_chunks(tmp_path):
+    path = str(tmp_path / "session.trk")
+    frames = 3000
+    recorder = beta.TrackingRecorder(path, seed=4242)
+    for frame in range(frames):
+        for kind, source, code, values in frame_records(frame):
+            recorder.record(kind, source, code, values)
+        recorder.end_frame()
+    recorder.close()
+    assert recorder.records > beta.TrackingReplay.CHUNK_RECORDS
+
+    replay = beta.TrackingReplay(path)
+    assert replay.seed == 4242
+    total = 0
+    for frame in range(frames):
+        records = replay.next_frame()
+        assert [record[1] for record in records] == [frame] * len(records)
+        assert [(kind, source, code, tuple(values)) for _, _, kind, source, code, *values in records] == \
+            [(kind, source, code, tuple(float(v) for v in values))
+             for kind, source, code, values in frame_records(frame)]
+        total += len(records)
+    assert replay.next_frame() == []
+    assert replay.finished
+    assert total == recorder.records
+
+
+def write_header(path, magic=beta.TRACKING_MAGIC, version=beta.TRACKING_VERSION):
+    with open(path, "wb") as f:
+        f.write(beta.TRACKING_HEADER.pack(magic, version, beta.TRACKING_RECORD.size, 1, 0.0))
+
+
+@pytest.mark.parametrize("header", [
+    {"magic": b"NOTATRK\0"},
+    {"version": beta.TRACKING_VERSION + 1},
+])
+def test_bad_header_raises_value_error(tmp_path, header):
+    path = str(tmp_path / "bad.trk")
+    write_header(path, **header)
+    with pytest.raises(ValueError):
+        beta.TrackingReplay(path)
+
+
+def test_truncated_header_raises_value_error(tmp_path):
+    path = str(tmp_path / "short.trk")
+    with open(path, "wb") as f:
+        f.write(struct.pack("<8s", beta.TRACKING_MAGIC))
+    with pytest.raises(ValueError):
+        beta.TrackingReplay(path)